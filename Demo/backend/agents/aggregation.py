@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Sequence, Tuple
+
+
+def _codes(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Integer codes (-1 for missing) and sorted labels; free for categorical columns"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), np.asarray(values.cat.categories, dtype=object)
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def aggregate_frame(df: pd.DataFrame, measures: Sequence[str], group_sums: Dict[str, str] = None,
+                    count_by: Sequence[str] = ()) -> Dict[str, Any]:
+    """Every measure, per-group sum and per-value count of one frame without building filtered frames.
+
+    All group columns are fused into one key, so the rows are binned once for counts and once per
+    summed measure; per-column results are marginals of those cells. group_sums maps a group column
+    to the measure summed per group; results keep only observed groups, ordered by label like a groupby.
+    """
+    group_sums = group_sums or {}
+    result = {'rows': len(df), 'sums': {}, 'group_sums': {}, 'counts': {}}
+    for measure in measures:
+        result['sums'][measure] = float(df[measure].to_numpy().sum())
+
+    columns = list(dict.fromkeys([*group_sums, *count_by]))
+    if not columns:
+        return result
+
+    # Mixed-radix key over (code + 1) per column; slot 0 holds missing values
+    codes, labels = {}, {}
+    for column in columns:
+        codes[column], labels[column] = _codes(df[column])
+    shape = [len(labels[column]) + 1 for column in columns]
+    size = int(np.prod(shape))
+
+    # Build the key in the narrowest integer type (far less memory traffic), widen once for bincount
+    key = np.zeros(len(df), dtype=np.int16 if size < 2 ** 15 else np.int32 if size < 2 ** 31 else np.int64)
+    for column, width in zip(columns, shape):
+        key *= width
+        key += codes[column]
+        key += 1
+    key = key.astype(np.intp, copy=False)
+
+    counts = np.bincount(key, minlength=size).reshape(shape)
+    cell_sums = {
+        measure: np.bincount(key, weights=df[measure].to_numpy(dtype=np.float64), minlength=counts.size).reshape(shape)
+        for measure in dict.fromkeys(group_sums.values())
+    }
+
+    def marginal(cells: np.ndarray, column: str) -> np.ndarray:
+        axis = columns.index(column)
+        return cells.sum(axis=tuple(i for i in range(len(shape)) if i != axis))[1:]
+
+    for column, measure in group_sums.items():
+        observed = marginal(counts, column) > 0
+        sums = marginal(cell_sums[measure], column)
+        result['group_sums'][column] = pd.Series(sums[observed], index=labels[column][observed])
+
+    for column in count_by:
+        result['counts'][column] = {label: int(n) for label, n in zip(labels[column], marginal(counts, column)) if n}
+    return result
@@ -64,13 +64,14 @@ class AnalyticsAgent:
         
         return insights
     
-    def forecast_trends(self, data: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+    def forecast_trends(self, data: Dict[str, pd.DataFrame], daily_sales: pd.Series = None) -> Dict[str, Any]:
         forecasts = {}
         
         if 'sales_transactions' in data:
             df = data['sales_transactions']
             if len(df) > 7:
-                sales_by_date = df.groupby('date')['total'].sum().sort_index()
+                # A pre-rolled daily series (from the rollup cube) saves the groupby
+                sales_by_date = daily_sales if daily_sales is not None else df.groupby('date')['total'].sum().sort_index()
                 recent_trend = sales_by_date.tail(7).mean()
                 previous_trend = sales_by_date.head(7).mean()
                 growth_rate = ((recent_trend - previous_trend) / previous_trend) * 100 if previous_trend > 0 else 0
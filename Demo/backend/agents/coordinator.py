@@ -1,6 +1,13 @@
+import re
+import copy
+import json
 import math
+import time
+import asyncio
 from typing import Dict, Any
 
+from graph.workflow_graph import create_workflow_graph
+
 class CoordinatorAgent:
     """Main coordinator orchestrating all agents"""
     
@@ -10,12 +17,31 @@ class CoordinatorAgent:
         from .report_agent import ReportGenerationAgent
         from .analytics_agent import AnalyticsAgent
         from .workflow_agent import WorkflowAgent
+        from .stage_cache import StageCache
         
-        self.query_parser = QueryParserAgent()
+        # Parse prompts and report payloads repeat verbatim, so these two answer from the LLM cache
+        self.query_parser = QueryParserAgent(use_cache=True)
         self.data_agent = DataIntegrationAgent()
-        self.report_agent = ReportGenerationAgent()
+        self.report_agent = ReportGenerationAgent(use_cache=True)
         self.analytics_agent = AnalyticsAgent()
         self.workflow_agent = WorkflowAgent()
+        # Fetch/aggregate/analytics outputs shared across requests with the same sources and filters
+        self.stage_cache = StageCache.from_env()
+        self.graph = create_workflow_graph(self)
+
+        # Identical in-flight requests share one computation (single-flight)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.metrics = {'requests': 0, 'coalesced_requests': 0}
+
+    # DAG state key -> streamed event / result key
+    STAGE_EVENTS = {
+        'parsed_request': 'parsed_request',
+        'workflow': 'workflow',
+        'aggregated': 'aggregated_data',
+        'anomalies': 'anomalies',
+        'insights': 'insights',
+        'forecasts': 'forecasts'
+    }
 
     def _clean_json(self, obj):
         """Recursively replace NaN/inf in dict/list with None for JSON serialization"""
@@ -30,6 +56,30 @@ class CoordinatorAgent:
         else:
             return obj
     
+    def cached(self, stage: str, data_key, compute):
+        if self.stage_cache is None:
+            return compute()
+        return self.stage_cache.get_or_compute(stage, data_key, compute)
+
+    def fetch_data(self, parsed_request: Dict[str, Any]):
+        """(data, fetch_stats, data_key); data_key is None when the fetch was partial and must not be reused"""
+        data_sources = parsed_request.get('data_sources', [])
+        filters = parsed_request.get('filters', {})
+        data_key = self.data_agent.cache_key(data_sources, filters)
+
+        cached = self.stage_cache.get('fetch_data', data_key) if self.stage_cache is not None else None
+        if cached is not None:
+            data, stats = cached
+            return data, {**stats, 'cache': 'hit'}, data_key
+
+        stats = {}
+        data = self.data_agent.fetch_data(data_sources=data_sources, filters=filters, stats=stats)
+        if stats.get('missing_sources'):
+            return data, {**stats, 'cache': 'bypass'}, None
+        if self.stage_cache is not None:
+            self.stage_cache.put('fetch_data', data_key, (data, stats))
+        return data, {**stats, 'cache': 'miss'}, data_key
+
     def process_user_query(self, user_query: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
         """Main orchestration from natural language query"""
         
@@ -45,21 +95,20 @@ class CoordinatorAgent:
             result['workflow'] = workflow
             
             #Fetch data
-            data = self.data_agent.fetch_data(
-                data_sources=parsed_request.get('data_sources', []),
-                filters=parsed_request.get('filters', {})
-            )
+            data, result['fetch_stats'], data_key = self.fetch_data(parsed_request)
             result['data_sources_used'] = list(data.keys())
             result['records_fetched'] = {k: len(v) for k, v in data.items()}
             
             #Aggregate
-            aggregated = self.data_agent.aggregate_data(data)
+            filters = parsed_request.get('filters', {})
+            aggregated = self.cached('aggregate', data_key, lambda: self.data_agent.aggregate_data(data, filters))
             result['aggregated_data'] = aggregated
             
             #Analytics
-            anomalies = self.analytics_agent.detect_anomalies(data)
-            insights = self.analytics_agent.generate_insights(data, aggregated)
-            forecasts = self.analytics_agent.forecast_trends(data)
+            anomalies = self.cached('detect_anomalies', data_key, lambda: self.analytics_agent.detect_anomalies(data))
+            insights = self.cached('generate_insights', data_key, lambda: self.analytics_agent.generate_insights(data, aggregated))
+            forecasts = self.cached('forecast_trends', data_key, lambda: self.analytics_agent.forecast_trends(
+                data, self.data_agent.daily_sales(data, filters)))
             
             result['anomalies'] = anomalies
             result['insights'] = insights
@@ -81,3 +130,101 @@ class CoordinatorAgent:
             result['error'] = str(e)
         
         return self._clean_json(result)
+
+    def _request_key(self, user_query: str, user_context: Dict[str, Any]) -> str:
+        """Normalized query plus the user context fields that reach the prompts"""
+        query = re.sub(r'\s+', ' ', user_query.lower()).strip().rstrip('?.!')
+        context = {k: user_context.get(k) for k in ('full_name', 'department', 'role')}
+        return json.dumps([query, context], sort_keys=True)
+
+    async def process_user_query_async(self, user_query: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Async orchestration; concurrent identical requests are coalesced into one run"""
+
+        self.metrics['requests'] += 1
+        key = self._request_key(user_query, user_context)
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_query_async(user_query, user_context))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.metrics['coalesced_requests'] += 1
+
+        # Shielded so one caller disconnecting does not cancel the shared run
+        result = copy.deepcopy(await asyncio.shield(task))
+        result['query'] = user_query
+        return result
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self.metrics, 'inflight_requests': len(self._inflight),
+                'data_memory': self.data_agent.schema.totals(),
+                'star_schema': self.data_agent.star.snapshot() if self.data_agent.star is not None else None,
+                'stage_cache': self.stage_cache.snapshot() if self.stage_cache is not None else None}
+
+    async def _run_query_async(self, user_query: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM calls are awaited and pandas work runs in a thread pool"""
+
+        result = {}
+        async for event, data in self.stream_user_query(user_query, user_context, stream_report=False):
+            if event == 'done':
+                result = data
+        return result
+
+    async def stream_user_query(self, user_query: str, user_context: Dict[str, Any], stream_report: bool = True):
+        """Yield (event, data) pairs as each pipeline stage completes, ending with a 'done' event"""
+
+        result = {'status': 'processing', 'query': user_query, 'timings': {}}
+        started = time.perf_counter()
+
+        try:
+            #Parse, build workflow, fetch, aggregate and analyze as a DAG
+            state = {'query': user_query, 'user_context': user_context}
+            async for node, outputs, elapsed_ms in self.graph.run(state):
+                result['timings'][node] = round(elapsed_ms, 2)
+
+                if node == 'fetch_data':
+                    data = outputs['data']
+                    result['data_sources_used'] = list(data.keys())
+                    result['records_fetched'] = {k: len(v) for k, v in data.items()}
+                    result['fetch_stats'] = outputs['fetch_stats']
+                    yield 'records_fetched', self._clean_json({
+                        'data_sources_used': result['data_sources_used'],
+                        'records_fetched': result['records_fetched'],
+                        'fetch_stats': result['fetch_stats']
+                    })
+                else:
+                    key, value = next(iter(outputs.items()))
+                    event = self.STAGE_EVENTS[key]
+                    result[event] = value
+                    yield event, self._clean_json(value)
+
+            #Generate report
+            report_started = time.perf_counter()
+            result['prompt_metrics'] = {}
+            report_args = dict(
+                report_focus=state['parsed_request'].get('report_focus', 'General Report'),
+                aggregated_data=state['aggregated'],
+                insights=state['insights'],
+                anomalies=state['anomalies'],
+                forecasts=state['forecasts'],
+                metrics=result['prompt_metrics']
+            )
+            if stream_report:
+                chunks = []
+                async for token in self.report_agent.stream_report_async(**report_args):
+                    chunks.append(token)
+                    yield 'report_token', {'token': token}
+                report = ''.join(chunks)
+            else:
+                report = await self.report_agent.generate_report_async(**report_args)
+            result['timings']['generate_report'] = round((time.perf_counter() - report_started) * 1000, 2)
+            result['report'] = report
+            result['status'] = 'completed'
+
+        except Exception as e:
+            result['status'] = 'error'
+            result['error'] = str(e)
+
+        result['timings']['total'] = round((time.perf_counter() - started) * 1000, 2)
+        yield 'done', self._clean_json(result)
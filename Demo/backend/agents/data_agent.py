@@ -1,62 +1,309 @@
-from typing import Dict, Any
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, Optional
 import pandas as pd
 from mock_data.mock_apis import MockERPSystem, MockCRMSystem, MockBusinessTransactions
 from mock_data.data_generator import DataGenerator
+from mock_data.snapshot import SnapshotStore, SNAPSHOT_VERSION, seed_from_env
+from mock_data.connectors import connector_from_env, customer_industry_map, InMemoryConnector, SQLiteConnector, PARTITIONED_TABLES
+from mock_data.rollup import RollupCube
+from mock_data.schema import SchemaLayer, KEY_COLUMNS
+from mock_data.dimensions import StarSchema
+from .aggregation import aggregate_frame
+from mock_data.filters import normalize_filters
+
+DATASET_SIZES = {'crm': 100, 'sales': 200, 'financial': 12, 'inventory': 50, 'opportunities': 80, 'transactions': 150}
+
+# fetch_data result key -> (source, owning table, rollup measures) for the sources that accept appends
+INGESTABLE = {'sales_transactions': ('erp_sales', 'sales', ['total', 'quantity']),
+              'business_transactions': ('transactions', 'transactions', ['amount'])}
 
 class DataIntegrationAgent:
     """Agent responsible for fetching and aggregating linked ERP, CRM, and transaction data"""
     
-    def __init__(self):
-        crm_df = DataGenerator.generate_crm_data(num_customers=100)
+    def __init__(self, fetch_timeout: Optional[float] = None, source_timeouts: Optional[Dict[str, float]] = None,
+                 allow_partial: Optional[bool] = None, max_workers: Optional[int] = None):
+        # Reuse the on-disk snapshot when present; otherwise generate (seeded) and persist it
+        seed = seed_from_env()
+        store = SnapshotStore.from_env(DATASET_SIZES)
+        frames = store.load() if store else None
+        if frames is None:
+            frames = DataGenerator.generate_datasets(DATASET_SIZES, seed=seed)
+            # Date-ordered fact tables split into time partitions by slicing, without reordering copies
+            for table, column in PARTITIONED_TABLES.items():
+                frames[table] = frames[table].sort_values(column, kind='stable', ignore_index=True)
+            if store:
+                store.save(frames)
+
+        # Compact dtypes and surrogate keys before anything indexes the frames
+        self.schema = SchemaLayer()
+        if os.getenv("DATA_COMPACT", "true").lower() in ("1", "true", "yes"):
+            frames = self.schema.apply(frames)
+        # Customer/product/region dimensions keyed by those surrogates; fact tables keep only the keys
+        self.star = None
+        if self.schema.report and os.getenv("DATA_STAR_SCHEMA", "true").lower() in ("1", "true", "yes"):
+            self.star = StarSchema(frames)
+        crm_df = frames['crm']
+
+        # One connector (in-memory or SQLite, per DATA_CONNECTOR) serves all three systems
+        fingerprint = {'version': SNAPSHOT_VERSION, 'seed': seed, 'sizes': DATASET_SIZES}
+        self.connector = connector_from_env({**frames, 'customers': frames['crm']}, fingerprint, star=self.star)
+        if not isinstance(self.connector, InMemoryConnector):
+            self.star = None  # SQLite keeps its denormalized, indexed tables
+        self.crm = MockCRMSystem(crm_df, connector=self.connector)
+        self.erp = MockERPSystem(crm_df, connector=self.connector)
+        self.transactions = MockBusinessTransactions(crm_df, connector=self.connector)
+        self.rollups = self._build_rollups(frames)
+        self._columns = {name: list(df.columns) for name, df in frames.items()}
+        # Appended values for these must be numbers (key columns are checked against their dimension)
+        self._numeric = {name: [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])
+                                and c not in KEY_COLUMNS.get(name, {})] for name, df in frames.items()}
+        # Cubes follow appends, so report latency stays flat as the sources grow
+        self.erp.on_append(self._extend_rollup)
+        self.transactions.on_append(self._extend_rollup)
+
+        # data source -> (result key, reader, owning system)
+        self.sources = {
+            'erp_sales': ('sales_transactions', self.erp.get_sales_transactions, self.erp),
+            'erp_financial': ('financial_records', self.erp.get_financial_records, self.erp),
+            'erp_inventory': ('inventory', self.erp.get_inventory_data, self.erp),
+            'crm_customers': ('customers', self.crm.get_customer_data, self.crm),
+            'crm_opportunities': ('opportunities', self.crm.get_opportunities, self.crm),
+            'transactions': ('business_transactions', self.transactions.get_transactions, self.transactions)
+        }
+
+        # Sources are read concurrently; each gets its own timeout from the moment all are submitted
+        self.fetch_timeout = fetch_timeout if fetch_timeout is not None else float(os.getenv("DATA_FETCH_TIMEOUT_SECONDS", "10"))
+        self.source_timeouts = source_timeouts or {}
+        self.allow_partial = allow_partial if allow_partial is not None else \
+            os.getenv("DATA_FETCH_ALLOW_PARTIAL", "true").lower() in ("1", "true", "yes")
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or int(os.getenv("DATA_FETCH_WORKERS", "8")),
+                                            thread_name_prefix="data-fetch")
+
+    def _rollup_dimensions(self, key: str, df: pd.DataFrame) -> Dict[str, pd.Series]:
+        if key == 'sales_transactions':
+            return {'region': df['region'], 'product': df['product'],
+                    'industry': df['customer_id'].map(self._industry), 'status': df['status']}
+        return {'industry': df['customer_id'].map(self._industry),
+                'transaction_type': df['type'], 'status': df['status']}
+
+    def _build_rollups(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, RollupCube]:
+        """Rollup cubes keyed like fetch_data results, built once at load and extended on ingest"""
+        self._industry = customer_industry_map(frames['crm'])
+        return {
+            key: RollupCube(frames[table], 'date', self._rollup_dimensions(key, frames[table]), measures=measures)
+            for key, (_, table, measures) in INGESTABLE.items()
+        }
+
+    def _extend_rollup(self, table: str, batch: pd.DataFrame):
+        """Append listener: builds the cube covering the new rows; the returned swap installs it"""
+        key = next(k for k, (_, t, _) in INGESTABLE.items() if t == table)
+        cube = self.rollups[key].append(batch, self._rollup_dimensions(key, batch))
+
+        def swap():
+            self.rollups = {**self.rollups, key: cube}
+        return swap
+
+    def ingest(self, source: str, rows) -> Dict[str, Any]:
+        """Append new rows (DataFrame or list of dicts) to 'erp_sales' or 'transactions'"""
+        tables = {s: t for s, t, _ in INGESTABLE.values()}
+        if source not in tables:
+            raise ValueError(f"Source '{source}' does not accept appends; expected one of {sorted(tables)}")
+        table = tables[source]
+        batch = pd.DataFrame(rows)
+        missing = [c for c in self._columns[table] if c not in batch.columns]
+        if missing:
+            raise ValueError(f"Missing columns for '{source}': {missing}")
+        batch = batch[self._columns[table]].reset_index(drop=True)
+        batch['date'] = pd.to_datetime(batch['date'])
+        for column in self._numeric[table]:
+            values = pd.to_numeric(batch[column], errors='coerce')
+            if values.isna().any():
+                raise ValueError(f"Column '{column}' for '{source}' must hold numbers")
+            batch[column] = values
+        customer_ids = batch['customer_id']
+        batch = self.schema.conform(table, batch)
+        unknown = ~batch['customer_id'].isin(self.crm.crm_df['customer_id']).to_numpy()
+        if unknown.any():
+            raise ValueError(f"Unknown customer_id for '{source}': {sorted(map(str, set(customer_ids[unknown])))[:5]}")
+
+        system = self.sources[source][2]
+        started = time.perf_counter()
+        version = system.append_sales(batch) if table == 'sales' else system.append_transactions(batch)
+        return {'source': source, 'rows': len(batch), 'data_version': version,
+                'ingest_ms': round((time.perf_counter() - started) * 1000, 2)}
+
+    def running_stats(self) -> Dict[str, Any]:
+        """Online-maintained counts, sums and Welford mean/variance per appendable source"""
+        return {'erp_sales': self.erp.sales_summary().to_dict(),
+                'transactions': self.transactions.transactions_summary().to_dict()}
+
+    def _rollup(self, data: Dict[str, pd.DataFrame], key: str, filters: Optional[Dict[str, Any]]) -> Optional[RollupCube]:
+        """The cube for `key` when it can stand in for the fetched rows, else None"""
+        if filters is None or key not in data or key not in self.rollups:
+            return None
+        clean_filters, _ = normalize_filters(filters)
+        return self.rollups[key] if self.rollups[key].supports(clean_filters) else None
+
+    def daily_sales(self, data: Dict[str, pd.DataFrame], filters: Optional[Dict[str, Any]] = None) -> Optional[pd.Series]:
+        """Sales total per day from the rollup cube, or None when the rows must be scanned"""
+        cube = self._rollup(data, 'sales_transactions', filters)
+        if cube is None:
+            return None
+        daily = cube.query(normalize_filters(filters)[0], ['date'])
+        return pd.Series(daily['total_sum'].to_numpy(), index=daily['date'], name='total')
 
-        self.crm = MockCRMSystem(crm_df)
-        self.erp = MockERPSystem(crm_df)
-        self.transactions = MockBusinessTransactions(crm_df)
+    def cache_key(self, data_sources: list, filters: Dict[str, Any]) -> tuple:
+        """(sources, canonical filters, ((source, data version), ...)) identifying a fetch and everything derived from it"""
+        sources = tuple(sorted(s for s in set(data_sources) if s in self.sources))
+        clean_filters, _ = normalize_filters(filters)
+        canonical = tuple(sorted((k, str(v)) for k, v in clean_filters.items()))
+        return sources, canonical, tuple((s, self.sources[s][2].data_version) for s in sources)
+
+    def _read_source(self, reader, filters: Dict[str, Any], source_stats: Dict[str, Any]) -> pd.DataFrame:
+        started = time.perf_counter()
+        df = reader(filters, source_stats)
+        source_stats['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return df
     
-    def fetch_data(self, data_sources: list, filters: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
-        """Fetch data from specified sources with filters"""
+    def fetch_data(self, data_sources: list, filters: Dict[str, Any], stats: Dict[str, Any] = None) -> Dict[str, pd.DataFrame]:
+        """Fetch all sources concurrently; per-source selectivity, latency and status go into `stats`"""
         data = {}
-        clean_filters = {k: v for k, v in filters.items() if v is not None}
-        
-        for source in data_sources:
-            if source == 'erp_sales':
-                data['sales_transactions'] = self.erp.get_sales_transactions(clean_filters)
-            elif source == 'erp_financial':
-                data['financial_records'] = self.erp.get_financial_records(clean_filters)
-            elif source == 'erp_inventory':
-                data['inventory'] = self.erp.get_inventory_data(clean_filters)
-            elif source == 'crm_customers':
-                data['customers'] = self.crm.get_customer_data(clean_filters)
-            elif source == 'crm_opportunities':
-                data['opportunities'] = self.crm.get_opportunities(clean_filters)
-            elif source == 'transactions':
-                data['business_transactions'] = self.transactions.get_transactions(clean_filters)
+        clean_filters, rejected = normalize_filters(filters)
+        source_stats = {}
+        started = time.monotonic()
+
+        futures = {}
+        for source in dict.fromkeys(data_sources):
+            if source in self.sources:
+                source_stats[source] = {}
+                futures[source] = self._executor.submit(self._read_source, self.sources[source][1],
+                                                        clean_filters, source_stats[source])
+
+        missing = {}
+        for source, future in futures.items():
+            deadline = started + self.source_timeouts.get(source, self.fetch_timeout)
+            try:
+                data[self.sources[source][0]] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                source_stats[source]['status'] = 'ok'
+            except FutureTimeoutError:
+                # The read keeps running in its worker; its result is discarded
+                missing[source] = 'timeout'
+                source_stats[source] = {'status': 'timeout', 'latency_ms': round((time.monotonic() - started) * 1000, 2)}
+                if not self.allow_partial:
+                    raise TimeoutError(f"Data source '{source}' timed out")
+            except Exception as e:
+                missing[source] = str(e)
+                source_stats[source] = {'status': 'error', 'error': str(e)}
+                if not self.allow_partial:
+                    raise
         
+        if stats is not None:
+            stats['filters'] = {k: str(v.date()) if isinstance(v, pd.Timestamp) else v for k, v in clean_filters.items()}
+            stats['rejected_filters'] = rejected
+            stats['sources'] = source_stats
+            stats['missing_sources'] = missing
+            # Time-partitioned sources: how many partitions and rows the date filters let the read skip
+            stats['partition_pruning'] = {s: st['partitions'] for s, st in source_stats.items() if 'partitions' in st}
+            stats['fetch_ms'] = round((time.monotonic() - started) * 1000, 2)
         return data
 
-    def aggregate_data(self, data: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
-        """Aggregate data for reporting"""
+    @staticmethod
+    def _top(groups: pd.DataFrame, label: str, measure: str) -> str:
+        return groups.loc[groups[measure].idxmax(), label] if len(groups) else 'N/A'
+
+    def _pushed_sales_summary(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        totals = self.erp.aggregate_sales({'revenue': ('sum', 'total'), 'orders': ('count', '*'),
+                                           'quantity': ('sum', 'quantity')}, filters=filters).iloc[0]
+        by_product = self.erp.aggregate_sales({'revenue': ('sum', 'total')}, ['product'], filters)
+        by_region = self.erp.aggregate_sales({'revenue': ('sum', 'total')}, ['region'], filters)
+        # SUM over no rows is NULL
+        rows, revenue = int(totals['orders']), float(totals['revenue'] or 0)
+        return {
+            'total_revenue': revenue,
+            'total_transactions': rows,
+            'avg_transaction': revenue / rows if rows > 0 else 0,
+            'top_product': self._top(by_product, 'product', 'revenue'),
+            'top_region': self._top(by_region, 'region', 'revenue'),
+            'total_quantity': int(totals['quantity'] or 0)
+        }
+
+    def _pushed_crm_summary(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        totals = self.crm.aggregate_customers({'customers': ('count', '*'), 'deal_value': ('sum', 'deal_value')},
+                                              filters=filters).iloc[0]
+        by_industry = self.crm.aggregate_customers({'deal_value': ('sum', 'deal_value')}, ['industry'], filters)
+        by_stage = self.crm.aggregate_customers({'customers': ('count', '*')}, ['stage'], filters)
+        rows, deal_value = int(totals['customers']), float(totals['deal_value'] or 0)
+        won = int(by_stage.loc[by_stage['stage'] == 'Closed Won', 'customers'].sum())
+        return {
+            'total_customers': rows,
+            'total_deal_value': deal_value,
+            'avg_deal_value': deal_value / rows if rows > 0 else 0,
+            'conversion_rate': won / rows * 100 if rows > 0 else 0,
+            'top_industry': self._top(by_industry, 'industry', 'deal_value')
+        }
+
+    def _pushed_transaction_summary(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        by_status = self.transactions.aggregate_transactions(
+            {'transactions': ('count', '*'), 'amount': ('sum', 'amount')}, ['status'], filters).set_index('status')
+        return {
+            'total_transactions': int(by_status['transactions'].sum()),
+            'completed': int(by_status['transactions'].get('Completed', 0)),
+            'pending': int(by_status['transactions'].get('Pending', 0)),
+            'total_amount': float(by_status['amount'].sum())
+        }
+
+    def aggregate_data(self, data: Dict[str, pd.DataFrame], filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Aggregate data for reporting; with the query's filters, summaries come from the rollup cubes or,
+        on a SQL connector, are pushed down as GROUP BY queries instead of scanning the fetched rows"""
         aggregated = {}
-        
-        if 'sales_transactions' in data:
-            df = data['sales_transactions']
+        clean_filters, _ = normalize_filters(filters)
+        # The pushed-down queries apply the same filters the fetch did, so they see the same rows
+        pushdown = filters is not None and isinstance(self.connector, SQLiteConnector)
+
+        sales_cube = self._rollup(data, 'sales_transactions', filters)
+        if sales_cube is not None:
+            totals = sales_cube.query(clean_filters).iloc[0]
+            count = int(totals['count'])
+            by_product = sales_cube.query(clean_filters, ['product'])
+            by_region = sales_cube.query(clean_filters, ['region'])
             aggregated['sales_summary'] = {
-                'total_revenue': float(df['total'].sum()),
-                'total_transactions': len(df),
-                'avg_transaction': float(df['total'].mean()) if len(df) > 0 else 0,
-                'top_product': df.groupby('product')['total'].sum().idxmax() if len(df) > 0 else 'N/A',
-                'top_region': df.groupby('region')['total'].sum().idxmax() if len(df) > 0 else 'N/A',
-                'total_quantity': int(df['quantity'].sum())
+                'total_revenue': float(totals['total_sum']),
+                'total_transactions': count,
+                'avg_transaction': float(totals['total_sum'] / count) if count > 0 else 0,
+                'top_product': by_product.loc[by_product['total_sum'].idxmax(), 'product'] if count > 0 else 'N/A',
+                'top_region': by_region.loc[by_region['total_sum'].idxmax(), 'region'] if count > 0 else 'N/A',
+                'total_quantity': int(totals['quantity_sum'])
+            }
+        elif pushdown and 'sales_transactions' in data:
+            aggregated['sales_summary'] = self._pushed_sales_summary(clean_filters)
+        elif 'sales_transactions' in data:
+            # One pass over the rows: sums plus per-product and per-region totals
+            result = aggregate_frame(data['sales_transactions'], ['total', 'quantity'],
+                                     group_sums={'product': 'total', 'region': 'total'})
+            rows, revenue = result['rows'], result['sums']['total']
+            aggregated['sales_summary'] = {
+                'total_revenue': revenue,
+                'total_transactions': rows,
+                'avg_transaction': revenue / rows if rows > 0 else 0,
+                'top_product': result['group_sums']['product'].idxmax() if rows > 0 else 'N/A',
+                'top_region': result['group_sums']['region'].idxmax() if rows > 0 else 'N/A',
+                'total_quantity': int(result['sums']['quantity'])
             }
         
-        if 'customers' in data:
-            df = data['customers']
+        if pushdown and 'customers' in data:
+            aggregated['crm_summary'] = self._pushed_crm_summary(clean_filters)
+        elif 'customers' in data:
+            result = aggregate_frame(data['customers'], ['deal_value'], group_sums={'industry': 'deal_value'},
+                                     count_by=['stage'])
+            rows, deal_value = result['rows'], result['sums']['deal_value']
             aggregated['crm_summary'] = {
-                'total_customers': len(df),
-                'total_deal_value': float(df['deal_value'].sum()),
-                'avg_deal_value': float(df['deal_value'].mean()) if len(df) > 0 else 0,
-                'conversion_rate': float((len(df[df['stage'] == 'Closed Won']) / len(df)) * 100) if len(df) > 0 else 0,
-                'top_industry': df.groupby('industry')['deal_value'].sum().idxmax() if len(df) > 0 else 'N/A'
+                'total_customers': rows,
+                'total_deal_value': deal_value,
+                'avg_deal_value': deal_value / rows if rows > 0 else 0,
+                'conversion_rate': result['counts']['stage'].get('Closed Won', 0) / rows * 100 if rows > 0 else 0,
+                'top_industry': result['group_sums']['industry'].idxmax() if rows > 0 else 'N/A'
             }
         
         if 'financial_records' in data:
@@ -68,13 +315,24 @@ class DataIntegrationAgent:
                 'avg_profit_margin': float(df['profit_margin'].mean()) if len(df) > 0 else 0
             }
         
-        if 'business_transactions' in data:
-            df = data['business_transactions']
+        transactions_cube = self._rollup(data, 'business_transactions', filters)
+        if transactions_cube is not None:
+            by_status = transactions_cube.query(clean_filters, ['status']).set_index('status')['count']
+            aggregated['transaction_summary'] = {
+                'total_transactions': int(by_status.sum()),
+                'completed': int(by_status.get('Completed', 0)),
+                'pending': int(by_status.get('Pending', 0)),
+                'total_amount': float(transactions_cube.query(clean_filters).iloc[0]['amount_sum'])
+            }
+        elif pushdown and 'business_transactions' in data:
+            aggregated['transaction_summary'] = self._pushed_transaction_summary(clean_filters)
+        elif 'business_transactions' in data:
+            result = aggregate_frame(data['business_transactions'], ['amount'], count_by=['status'])
             aggregated['transaction_summary'] = {
-                'total_transactions': len(df),
-                'completed': len(df[df['status'] == 'Completed']),
-                'pending': len(df[df['status'] == 'Pending']),
-                'total_amount': float(df['amount'].sum())
+                'total_transactions': result['rows'],
+                'completed': result['counts']['status'].get('Completed', 0),
+                'pending': result['counts']['status'].get('Pending', 0),
+                'total_amount': result['sums']['amount']
             }
         
         return aggregated
@@ -1,20 +1,128 @@
 import os
+import threading
+import importlib.util
+from typing import Dict, Any, Optional
+
 import httpx
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
 load_dotenv()
 
+from .llm_cache import LLMResponseCache, CachedLLM
+from .llm_resilience import LLMPolicy, ResilientLLM
+
+
+# Point LLM_BASE_URL at mock_data/mock_llm_server.py for local benchmarking
+MODEL = os.getenv("LLM_MODEL", "azure_ai/genailab-maas-DeepSeek-V3-0324")
+BASE_URL = os.getenv("LLM_BASE_URL", "https://genailab.tcs.in")
+
+
+class LLMClientManager:
+    """Owns one long-lived, pooled LLM client per model for the whole process"""
+
+    def __init__(self,
+                 max_connections: int = 20,
+                 max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 30.0,
+                 http2: bool = False):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        # HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._clients: Dict[str, ChatOpenAI] = {}
+        self._http_clients = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LLMClientManager":
+        return cls(
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10")),
+            keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30")),
+            http2=os.getenv("LLM_HTTP2", "false").lower() in ("1", "true", "yes")
+        )
+
+    def get(self, model: str = MODEL) -> ChatOpenAI:
+        """Return the shared client for `model`, creating it on first use"""
+        llm = self._clients.get(model)
+        if llm is not None:
+            return llm
+
+        with self._lock:
+            if model not in self._clients:
+                client = httpx.Client(verify=False, limits=self.limits, http2=self.http2)
+                async_client = httpx.AsyncClient(verify=False, limits=self.limits, http2=self.http2)
+                self._http_clients.append((client, async_client))
+
+                self._clients[model] = ChatOpenAI(
+                    base_url=BASE_URL,
+                    model=model,
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    http_client=client,
+                    http_async_client=async_client,
+                    # Retries are owned by ResilientLLM so deadlines stay bounded
+                    max_retries=0
+                )
+            return self._clients[model]
+
+    def _detach(self):
+        with self._lock:
+            http_clients = self._http_clients
+            self._http_clients = []
+            self._clients = {}
+        return http_clients
+
+    def close(self):
+        """Close every pooled connection (sync shutdown)"""
+        for client, _ in self._detach():
+            client.close()
+
+    async def aclose(self):
+        """Close every pooled connection (FastAPI lifespan shutdown)"""
+        for client, async_client in self._detach():
+            client.close()
+            await async_client.aclose()
+
+
+llm_manager = LLMClientManager.from_env()
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache.from_env()
+        return _llm_cache
+
+
+_policies: Dict[str, LLMPolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_policy(model: str = MODEL) -> LLMPolicy:
+    with _policies_lock:
+        if model not in _policies:
+            _policies[model] = LLMPolicy.from_env()
+        return _policies[model]
 
-MODEL = "azure_ai/genailab-maas-DeepSeek-V3-0324" 
 
+def llm_stats() -> Dict[str, Any]:
+    stats = {'models': {model: policy.snapshot() for model, policy in list(_policies.items())}}
+    if _llm_cache is not None:
+        stats['cache'] = _llm_cache.stats()
+    return stats
 
-def get_llm(model: str = MODEL) -> ChatOpenAI:
-    client = httpx.Client(verify=False) 
 
-    llm = ChatOpenAI(
-        base_url="https://genailab.tcs.in",
-        model=model,
-        api_key=os.getenv("OPENAI_API_KEY"),
-        http_client=client
-    )
-    return llm
\ No newline at end of file
+def get_llm(model: str = MODEL, cache: bool = False, deadline: Optional[float] = None):
+    """Shared client for `model` behind the resilience layer; agents opt into response caching with `cache=True`"""
+    llm = ResilientLLM(llm_manager.get(model), get_policy(model), deadline=deadline)
+    if cache and LLM_CACHE_ENABLED:
+        return CachedLLM(llm, get_llm_cache(), model)
+    return llm
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+
+class LLMResponseCache:
+    """SQLite-backed LLM response cache with TTL and size-bounded LRU eviction"""
+
+    def __init__(self, path: str = ".llm_cache.sqlite", ttl_seconds: float = 3600, max_entries: int = 1000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> last hit time; hits only touch memory, recency reaches the table on the next write
+        self._touched: Dict[str, float] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                content TEXT,
+                created_at REAL,
+                last_access REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> "LLMResponseCache":
+        return cls(
+            path=os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite"),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+        )
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, Any]]) -> str:
+        payload = json.dumps(messages, sort_keys=True, default=str)
+        return hashlib.sha256(f"{model}\n{payload}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._touched.pop(key, None)
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._touched[key] = now
+            self.hits += 1
+            return row[0]
+
+    def _flush_touched(self):
+        """Write buffered hit times in one statement; caller holds the lock and commits"""
+        if self._touched:
+            self._conn.executemany("UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                                   [(at, key) for key, at in self._touched.items()])
+            self._touched = {}
+
+    def set(self, key: str, model: str, content: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, content, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, content, now, now)
+            )
+            self._touched.pop(key, None)
+            # Eviction must see the recency of every hit so far
+            self._flush_touched()
+            # Evict least recently used rows beyond the size bound
+            self._conn.execute("""
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._touched = {}
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'entries': entries
+        }
+
+
+class CachedLLM:
+    """Wraps a chat model so identical message lists are answered from the cache"""
+
+    def __init__(self, llm, cache: LLMResponseCache, model: str):
+        self.llm = llm
+        self.cache = cache
+        self.model = model
+
+    def invoke(self, messages: List[Dict[str, Any]], **kwargs) -> AIMessage:
+        key = LLMResponseCache.make_key(self.model, messages)
+        content = self.cache.get(key)
+        if content is not None:
+            return AIMessage(content=content)
+
+        response = self.llm.invoke(messages, **kwargs)
+        self.cache.set(key, self.model, response.content)
+        return response
+
+    async def ainvoke(self, messages: List[Dict[str, Any]], **kwargs) -> AIMessage:
+        key = LLMResponseCache.make_key(self.model, messages)
+        content = self.cache.get(key)
+        if content is not None:
+            return AIMessage(content=content)
+
+        response = await self.llm.ainvoke(messages, **kwargs)
+        self.cache.set(key, self.model, response.content)
+        return response
+
+    async def astream(self, messages: List[Dict[str, Any]], **kwargs):
+        key = LLMResponseCache.make_key(self.model, messages)
+        content = self.cache.get(key)
+        if content is not None:
+            yield AIMessageChunk(content=content)
+            return
+
+        chunks = []
+        async for chunk in self.llm.astream(messages, **kwargs):
+            chunks.append(chunk.content)
+            yield chunk
+        # Only completed streams are cached
+        self.cache.set(key, self.model, ''.join(chunks))
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
@@ -0,0 +1,256 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the model while its circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one trial call through after `reset_timeout`"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == 'open':
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError("LLM endpoint unhealthy; circuit open")
+                self.state = 'half_open'
+            elif self.state == 'half_open':
+                # A trial call is already in flight
+                raise CircuitOpenError("LLM endpoint unhealthy; circuit half-open")
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def release(self):
+        """An interrupted trial call neither closes nor re-opens the breaker"""
+        with self._lock:
+            if self.state == 'half_open':
+                self.state = 'open'
+                self.opened_at = time.monotonic() - self.reset_timeout
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+
+class LLMPolicy:
+    """Shared per-model resilience state: latency history, breaker and counters"""
+
+    def __init__(self,
+                 max_retries: int = 2,
+                 backoff_seconds: float = 0.5,
+                 hedge: bool = True,
+                 hedge_percentile: float = 95,
+                 min_samples: int = 20,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = deque(maxlen=500)
+        self.stats = {'calls': 0, 'hedged': 0, 'hedge_wins': 0, 'retries': 0, 'timeouts': 0,
+                      'failures': 0, 'short_circuited': 0}
+
+    @classmethod
+    def from_env(cls) -> "LLMPolicy":
+        return cls(
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+            backoff_seconds=float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "0.5")),
+            hedge=os.getenv("LLM_HEDGE", "true").lower() in ("1", "true", "yes"),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+                reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+            )
+        )
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before sending a duplicate request, or None when not hedging"""
+        if not self.hedge or len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * self.hedge_percentile / 100) - 1]
+
+    def backoff(self, attempt: int) -> float:
+        # Exponential backoff with full jitter
+        return random.uniform(0, self.backoff_seconds * (2 ** attempt))
+
+    def snapshot(self) -> Dict[str, Any]:
+        delay = self.hedge_delay()
+        return {**self.stats, 'circuit': self.breaker.state,
+                'hedge_delay_ms': round(delay * 1000, 1) if delay is not None else None}
+
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+
+
+class ResilientLLM:
+    """Deadline, hedging, retries and circuit breaking around a chat model"""
+
+    def __init__(self, llm, policy: LLMPolicy, deadline: Optional[float] = None):
+        self.llm = llm
+        self.policy = policy
+        self.deadline = deadline
+
+    def _begin(self):
+        self.policy.stats['calls'] += 1
+        try:
+            self.policy.breaker.before_call()
+        except CircuitOpenError:
+            self.policy.stats['short_circuited'] += 1
+            raise
+
+    def _finish(self, error: Optional[BaseException]):
+        if error is None:
+            self.policy.breaker.record_success()
+        elif isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            self.policy.breaker.release()
+        else:
+            self.policy.stats['failures'] += 1
+            if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+                self.policy.stats['timeouts'] += 1
+            self.policy.breaker.record_failure()
+
+    async def ainvoke(self, messages: List[Dict[str, Any]], **kwargs):
+        self._begin()
+        try:
+            result = await asyncio.wait_for(self._aretry(messages, kwargs), timeout=self.deadline)
+        except BaseException as e:
+            self._finish(e)
+            raise
+        self._finish(None)
+        return result
+
+    async def _aretry(self, messages, kwargs):
+        for attempt in range(self.policy.max_retries + 1):
+            try:
+                return await self._ahedged(messages, kwargs)
+            except Exception:
+                if attempt == self.policy.max_retries:
+                    raise
+                self.policy.stats['retries'] += 1
+                await asyncio.sleep(self.policy.backoff(attempt))
+
+    async def _ahedged(self, messages, kwargs):
+        started = time.perf_counter()
+        tasks = {asyncio.create_task(self.llm.ainvoke(messages, **kwargs))}
+        primary = next(iter(tasks))
+        try:
+            delay = self.policy.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    self.policy.stats['hedged'] += 1
+                    tasks.add(asyncio.create_task(self.llm.ainvoke(messages, **kwargs)))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.policy.stats['hedge_wins'] += 1
+                        self.policy.latencies.append(time.perf_counter() - started)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def invoke(self, messages: List[Dict[str, Any]], **kwargs):
+        self._begin()
+        deadline = time.monotonic() + self.deadline if self.deadline else None
+        try:
+            result = self._retry(messages, kwargs, deadline)
+        except BaseException as e:
+            self._finish(e)
+            raise
+        self._finish(None)
+        return result
+
+    def _retry(self, messages, kwargs, deadline):
+        for attempt in range(self.policy.max_retries + 1):
+            try:
+                return self._hedged(messages, kwargs, deadline)
+            except TimeoutError:
+                raise
+            except Exception:
+                if attempt == self.policy.max_retries:
+                    raise
+                self.policy.stats['retries'] += 1
+                pause = self.policy.backoff(attempt)
+                if deadline and time.monotonic() + pause >= deadline:
+                    raise TimeoutError("LLM deadline exceeded")
+                time.sleep(pause)
+
+    def _hedged(self, messages, kwargs, deadline):
+        def remaining():
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        started = time.perf_counter()
+        primary = _executor.submit(self.llm.invoke, messages, **kwargs)
+        futures = {primary}
+        delay = self.policy.hedge_delay()
+        if delay is not None:
+            done, _ = wait(futures, timeout=delay if deadline is None else min(delay, remaining()))
+            if not done and (deadline is None or remaining() > 0):
+                self.policy.stats['hedged'] += 1
+                futures.add(_executor.submit(self.llm.invoke, messages, **kwargs))
+
+        error = None
+        while futures:
+            done, futures = wait(futures, timeout=remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                # Threads cannot be cancelled; abandoned calls finish in the background
+                raise TimeoutError("LLM deadline exceeded")
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self.policy.stats['hedge_wins'] += 1
+                    self.policy.latencies.append(time.perf_counter() - started)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def astream(self, messages: List[Dict[str, Any]], **kwargs):
+        """Streams are not hedged or retried; the deadline bounds the wait for the first chunk"""
+        self._begin()
+        error = None
+        try:
+            stream = self.llm.astream(messages, **kwargs).__aiter__()
+            first = await asyncio.wait_for(stream.__anext__(), timeout=self.deadline)
+            yield first
+            async for chunk in stream:
+                yield chunk
+        except StopAsyncIteration:
+            pass
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._finish(error)
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
@@ -0,0 +1,106 @@
+import json
+from typing import Dict, Any, List, Tuple
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional; fall back to a character estimate
+    _ENCODING = None
+
+SEVERITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+
+
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+
+def compact(obj: Any, digits: int = 2) -> Any:
+    """Round floats and drop empty values so numeric payloads serialize small"""
+    if isinstance(obj, dict):
+        return {k: compact(v, digits) for k, v in obj.items() if v is not None and v != {} and v != []}
+    if isinstance(obj, (list, tuple)):
+        return [compact(v, digits) for v in obj]
+    if isinstance(obj, float):
+        value = round(obj, digits)
+        return int(value) if value.is_integer() else value
+    if hasattr(obj, 'item'):  # numpy scalars
+        return compact(obj.item(), digits)
+    return obj
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(',', ':'), default=str)
+
+
+class PromptContextBuilder:
+    """Renders report sections within a token budget, dropping the least important items first"""
+
+    def __init__(self, token_budget: int = 3000):
+        self.token_budget = token_budget
+
+    def _render(self, name: str, items: List[Tuple[str, Any]], total: int) -> str:
+        if not items:
+            return f'({total} items omitted for length)'
+        if name == 'insights':
+            text = '\n'.join(f'- {value}' for _, value in items)
+        else:
+            text = _dumps(dict(items) if name != 'anomalies' else [v for _, v in items])
+        if len(items) < total:
+            text += f'\n({total - len(items)} more omitted for length)'
+        return text
+
+    def build(self,
+              aggregated_data: Dict[str, Any],
+              insights: list,
+              anomalies: list,
+              forecasts: Dict[str, Any]) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """Return rendered sections and prompt-size metrics"""
+        ranked_anomalies = sorted(anomalies or [], key=lambda a: SEVERITY_RANK.get(a.get('severity'), 3))
+
+        # Priority order: the earlier a section, the sooner it gets budget
+        sections = [
+            ('insights', [(str(i), v) for i, v in enumerate(insights or [])]),
+            ('anomalies', [(str(i), compact(v)) for i, v in enumerate(ranked_anomalies)]),
+            ('aggregated_data', list(compact(aggregated_data or {}).items())),
+            ('forecasts', list(compact(forecasts or {}).items())),
+        ]
+
+        raw_tokens = count_tokens(json.dumps(aggregated_data, indent=2, default=str)) + \
+            count_tokens(json.dumps(anomalies, indent=2, default=str)) + \
+            count_tokens(json.dumps(forecasts, indent=2, default=str)) + \
+            count_tokens('\n'.join(f'- {i}' for i in insights or []))
+
+        remaining = self.token_budget
+        rendered, section_tokens, truncated = {}, {}, []
+        for name, items in sections:
+            keep = len(items)
+            text = self._render(name, items, len(items)) if items else 'None'
+            if items and count_tokens(text) > remaining:
+                # Largest prefix of the section that still fits
+                lo, hi = 0, len(items) - 1
+                while lo < hi:
+                    mid = (lo + hi + 1) // 2
+                    if count_tokens(self._render(name, items[:mid], len(items))) <= remaining:
+                        lo = mid
+                    else:
+                        hi = mid - 1
+                keep = lo
+                text = self._render(name, items[:keep], len(items))
+            if items and keep < len(items):
+                truncated.append(name)
+            tokens = count_tokens(text)
+            rendered[name] = text
+            section_tokens[name] = tokens
+            remaining = max(0, remaining - tokens)
+
+        metrics = {
+            'token_budget': self.token_budget,
+            'context_tokens': sum(section_tokens.values()),
+            'raw_context_tokens': raw_tokens,
+            'section_tokens': section_tokens,
+            'truncated_sections': truncated,
+            'tokenizer': 'tiktoken' if _ENCODING is not None else 'estimate'
+        }
+        return rendered, metrics
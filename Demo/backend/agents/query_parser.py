@@ -2,14 +2,19 @@ from typing import Dict, Any
 import json
 
 from .llm import get_llm
+from .rule_parser import RuleBasedQueryParser
 
 class QueryParserAgent:
     """Agent that parses user natural language queries into structured requests"""
+
+    def __init__(self, use_cache: bool = False, confidence_threshold: float = 0.75, deadline_seconds: float = 15):
+        self.use_cache = use_cache
+        self.deadline_seconds = deadline_seconds
+        self.confidence_threshold = confidence_threshold
+        self.rule_parser = RuleBasedQueryParser()
     
-    def parse_query(self, user_query: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
-        """Parse natural language query into structured request"""
-        
-        prompt = f"""Parse this user query into a structured report request.
+    def _build_prompt(self, user_query: str, user_context: Dict[str, Any]) -> str:
+        return f"""Parse this user query into a structured report request.
 
 User Query: "{user_query}"
 
@@ -53,38 +58,83 @@ Return ONLY valid JSON (no markdown):
 }}
 """
 
+    def _parse_response(self, response_text: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
+        response_text = response_text.strip()
+        response_text = (
+            response_text.replace("```json", "")
+                         .replace("```", "")
+                         .strip()
+        )
+
+        parsed_request = json.loads(response_text)
+
+        parsed_request['requestor'] = user_context.get('full_name', 'Unknown')
+        parsed_request['department'] = user_context.get('department', 'Unknown')
+        parsed_request['user_role'] = user_context.get('role', 'Unknown')
+
+        return parsed_request
+
+    def _fallback(self, user_query: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "report_type": "custom",
+            "data_sources": ["erp_sales"],
+            "filters": {},
+            "urgency": "normal",
+            "value_impact": "medium",
+            "report_focus": user_query,
+            "interpretation": "General report request",
+            "requestor": user_context.get('full_name', 'Unknown'),
+            "department": user_context.get('department', 'Unknown'),
+            "user_role": user_context.get('role', 'Unknown')
+        }
+
+    def _parse_with_rules(self, user_query: str, user_context: Dict[str, Any]):
+        """Return the rule-based parse when it is confident enough, else None"""
+        parsed_request, confidence = self.rule_parser.parse(user_query, user_context)
+        if confidence < self.confidence_threshold:
+            return None
+        parsed_request['parser'] = 'rules'
+        parsed_request['parse_confidence'] = confidence
+        return parsed_request
+
+    def parse_query(self, user_query: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse natural language query into structured request"""
+
+        parsed_request = self._parse_with_rules(user_query, user_context)
+        if parsed_request is not None:
+            return parsed_request
+
+        prompt = self._build_prompt(user_query, user_context)
+
         try:
-            llm = get_llm()
+            llm = get_llm(cache=self.use_cache, deadline=self.deadline_seconds)
 
             response = llm.invoke([
                 {"role": "user", "content": prompt}
             ])
 
-            response_text = response.content.strip()
-            response_text = (
-                response_text.replace("```json", "")
-                             .replace("```", "")
-                             .strip()
-            )
-
-            parsed_request = json.loads(response_text)
+            return self._parse_response(response.content, user_context)
+            
+        except Exception:
+            return self._fallback(user_query, user_context)
 
-            parsed_request['requestor'] = user_context.get('full_name', 'Unknown')
-            parsed_request['department'] = user_context.get('department', 'Unknown')
-            parsed_request['user_role'] = user_context.get('role', 'Unknown')
+    async def parse_query_async(self, user_query: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of parse_query built on ainvoke"""
 
+        parsed_request = self._parse_with_rules(user_query, user_context)
+        if parsed_request is not None:
             return parsed_request
-            
+
+        prompt = self._build_prompt(user_query, user_context)
+
+        try:
+            llm = get_llm(cache=self.use_cache, deadline=self.deadline_seconds)
+
+            response = await llm.ainvoke([
+                {"role": "user", "content": prompt}
+            ])
+
+            return self._parse_response(response.content, user_context)
+
         except Exception:
-            return {
-                "report_type": "custom",
-                "data_sources": ["erp_sales"],
-                "filters": {},
-                "urgency": "normal",
-                "value_impact": "medium",
-                "report_focus": user_query,
-                "interpretation": "General report request",
-                "requestor": user_context.get('full_name', 'Unknown'),
-                "department": user_context.get('department', 'Unknown'),
-                "user_role": user_context.get('role', 'Unknown')
-            }
+            return self._fallback(user_query, user_context)
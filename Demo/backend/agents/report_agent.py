@@ -1,34 +1,42 @@
-from typing import Dict, Any
-import json
+from typing import Dict, Any, Optional
+import os
 
 from .llm import get_llm
-from typing import Dict, Any
-import json
+from .prompt_context import PromptContextBuilder, count_tokens
 
 class ReportGenerationAgent:
 
-    def generate_report(self, 
-                       report_focus: str,
-                       aggregated_data: Dict[str, Any],
-                       insights: list,
-                       anomalies: list,
-                       forecasts: Dict[str, Any]) -> str:
-        
+    def __init__(self, use_cache: bool = False, token_budget: Optional[int] = None, deadline_seconds: float = 60):
+        self.use_cache = use_cache
+        self.deadline_seconds = deadline_seconds
+        if token_budget is None:
+            token_budget = int(os.getenv("REPORT_CONTEXT_TOKEN_BUDGET", "3000"))
+        self.context_builder = PromptContextBuilder(token_budget=token_budget)
+
+    def _build_prompt(self,
+                      report_focus: str,
+                      aggregated_data: Dict[str, Any],
+                      insights: list,
+                      anomalies: list,
+                      forecasts: Dict[str, Any],
+                      metrics: Optional[Dict[str, Any]] = None) -> str:
+        sections, context_metrics = self.context_builder.build(aggregated_data, insights, anomalies, forecasts)
+
         prompt = f"""Generate a professional business report based on this data:
 
 Report Focus: {report_focus}
 
 Data Summary:
-{json.dumps(aggregated_data, indent=2)}
+{sections['aggregated_data']}
 
 Key Insights:
-{chr(10).join(f'- {insight}' for insight in insights)}
+{sections['insights']}
 
 Anomalies Detected:
-{json.dumps(anomalies, indent=2) if anomalies else 'None'}
+{sections['anomalies']}
 
 Forecasts:
-{json.dumps(forecasts, indent=2) if forecasts else 'None'}
+{sections['forecasts']}
 
 Generate the report with:
 1. Executive Summary
@@ -38,9 +46,23 @@ Generate the report with:
 5. Recommendations
 6. Future Outlook
 """
+        if metrics is not None:
+            metrics.update(context_metrics)
+            metrics['prompt_tokens'] = count_tokens(prompt)
+        return prompt
+
+    def generate_report(self, 
+                       report_focus: str,
+                       aggregated_data: Dict[str, Any],
+                       insights: list,
+                       anomalies: list,
+                       forecasts: Dict[str, Any],
+                       metrics: Optional[Dict[str, Any]] = None) -> str:
+        
+        prompt = self._build_prompt(report_focus, aggregated_data, insights, anomalies, forecasts, metrics)
 
         try:
-            llm = get_llm()
+            llm = get_llm(cache=self.use_cache, deadline=self.deadline_seconds)
             response = llm.invoke([
                 {"role": "user", "content": prompt}
             ])
@@ -49,3 +71,47 @@ Generate the report with:
 
         except Exception as e:
             return f"Error generating report: {str(e)}"
+
+    async def generate_report_async(self,
+                                    report_focus: str,
+                                    aggregated_data: Dict[str, Any],
+                                    insights: list,
+                                    anomalies: list,
+                                    forecasts: Dict[str, Any],
+                                    metrics: Optional[Dict[str, Any]] = None) -> str:
+        """Async variant of generate_report built on ainvoke"""
+
+        prompt = self._build_prompt(report_focus, aggregated_data, insights, anomalies, forecasts, metrics)
+
+        try:
+            llm = get_llm(cache=self.use_cache, deadline=self.deadline_seconds)
+            response = await llm.ainvoke([
+                {"role": "user", "content": prompt}
+            ])
+
+            return response.content
+
+        except Exception as e:
+            return f"Error generating report: {str(e)}"
+
+    async def stream_report_async(self,
+                                  report_focus: str,
+                                  aggregated_data: Dict[str, Any],
+                                  insights: list,
+                                  anomalies: list,
+                                  forecasts: Dict[str, Any],
+                                  metrics: Optional[Dict[str, Any]] = None):
+        """Yield the report token by token as the LLM produces it"""
+
+        prompt = self._build_prompt(report_focus, aggregated_data, insights, anomalies, forecasts, metrics)
+
+        try:
+            llm = get_llm(cache=self.use_cache, deadline=self.deadline_seconds)
+            async for chunk in llm.astream([
+                {"role": "user", "content": prompt}
+            ]):
+                if chunk.content:
+                    yield chunk.content
+
+        except Exception as e:
+            yield f"Error generating report: {str(e)}"
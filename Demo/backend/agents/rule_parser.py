@@ -0,0 +1,196 @@
+import re
+import calendar
+from typing import Dict, Any, List, Tuple
+
+REPORTING_YEAR = 2025
+
+QUARTERS = {1: ('01-01', '03-31'), 2: ('04-01', '06-30'), 3: ('07-01', '09-30'), 4: ('10-01', '12-31')}
+QUARTER_WORDS = {'first': 1, '1st': 1, 'second': 2, '2nd': 2, 'third': 3, '3rd': 3, 'fourth': 4, '4th': 4}
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+
+REGIONS = ['North', 'South', 'East', 'West', 'Central']
+PRODUCTS = ['Product A', 'Product B', 'Product C', 'Product D', 'Product E']
+INDUSTRIES = {
+    'technology': 'Technology', 'tech': 'Technology',
+    'healthcare': 'Healthcare', 'health care': 'Healthcare',
+    'retail': 'Retail',
+    'manufacturing': 'Manufacturing',
+}
+TRANSACTION_TYPES = {'purchase': 'Purchase', 'refund': 'Refund', 'payment': 'Payment'}
+STATUSES = {'pending': 'Pending', 'completed': 'Completed', 'failed': 'Failed', 'processing': 'Processing', 'shipped': 'Shipped'}
+
+# Keyword -> (report_type, data_sources); earlier entries win the report type
+REPORT_KEYWORDS: List[Tuple[str, str, List[str]]] = [
+    (r'executive|board|company[- ]wide|kpis?|business overview', 'executive', ['erp_sales', 'erp_financial', 'crm_customers']),
+    (r'financ\w*|profits?|expenses?|margins?|p&l|income|budget', 'financial', ['erp_financial']),
+    (r'crm|pipeline|opportunit\w*|deals?|leads?', 'crm', ['crm_customers', 'crm_opportunities']),
+    (r'customers?|clients?|accounts?', 'crm', ['crm_customers']),
+    (r'sales|sold|selling|revenue', 'sales', ['erp_sales']),
+    (r'inventory|stock|warehouses?', 'custom', ['erp_inventory']),
+    (r'transactions?|orders?|payments?|refunds?|purchases?', 'custom', ['transactions']),
+]
+
+URGENCY_HIGH = r'urgent\w*|asap|immediately|critical|right away|today'
+URGENCY_LOW = r'low priority|no rush|whenever|when you can'
+VALUE_HIGH = r'strategic|board|executive|high[- ]value|major|million'
+
+# A bare "over 500" is only an amount with a currency sign, a k/m suffix or one of these words nearby
+AMOUNT_CONTEXT = r'amounts?|revenue|deals?|values?|worth|totals?|spend\w*|dollars?|usd'
+TIME_UNITS = r'days?|weeks?|months?|quarters?|years?|hours?'
+
+# Words that shape the narrative but not the structured request
+FILLER = {
+    'show', 'me', 'give', 'get', 'i', 'need', 'needed', 'want', 'please', 'can', 'you', 'a', 'an', 'the',
+    'of', 'for', 'in', 'on', 'by', 'with', 'and', 'to', 'all', 'our', 'my', 'is', 'are', 'what', 'this',
+    'report', 'reports', 'reporting', 'analysis', 'analyze', 'analyse', 'summary', 'overview', 'breakdown',
+    'performance', 'performing', 'top', 'best', 'trends', 'trend', 'forecast', 'forecasts', 'data',
+    'compare', 'comparison', 'across', 'region', 'regions', 'regional', 'product', 'products', 'view',
+    'sector', 'industry', 'detailed', 'details', 'status', 'insights', 'generate', 'create', 'full',
+}
+
+
+class RuleBasedQueryParser:
+    """Deterministic parser for common report queries; returns the LLM schema plus a confidence"""
+
+    def parse(self, user_query: str, user_context: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+        query = user_query.lower()
+        spans: List[Tuple[int, int]] = []
+
+        def find(pattern: str, text: str = query):
+            matches = list(re.finditer(rf'\b(?:{pattern})\b', text))
+            spans.extend(m.span() for m in matches)
+            return matches
+
+        filters: Dict[str, Any] = {
+            'date_from': None, 'date_to': None, 'region': None, 'product': None,
+            'industry': None, 'min_amount': None, 'transaction_type': None
+        }
+
+        # Dates; rules only know the reporting year, so a query naming another year is left uncovered
+        # (its confidence drops and the LLM parses it)
+        year = str(REPORTING_YEAR)
+        other_year = any(y != year for y in re.findall(r'\b(20\d\d)\b', query))
+        if other_year:
+            pass
+        elif match := (find(rf'q([1-4])(?:\s*(?:of\s*)?{year})?') +
+                       find(rf'(first|1st|second|2nd|third|3rd|fourth|4th) quarter(?:\s*(?:of\s*)?{year})?')):
+            # Several quarters ("Q1 and Q2") span from the first to the last, like months do
+            quarters = sorted(int(g) if g.isdigit() else QUARTER_WORDS[g] for g in (m.group(1) for m in match))
+            filters['date_from'] = f'{REPORTING_YEAR}-{QUARTERS[quarters[0]][0]}'
+            filters['date_to'] = f'{REPORTING_YEAR}-{QUARTERS[quarters[-1]][1]}'
+        elif find(rf'h([12])(?:\s*{year})?|(first|second) half(?:\s*of\s*(?:the\s*)?year)?'):
+            first_half = re.search(r'\bh1\b|\bfirst half\b', query) is not None
+            filters['date_from'] = f'{REPORTING_YEAR}-01-01' if first_half else f'{REPORTING_YEAR}-07-01'
+            filters['date_to'] = f'{REPORTING_YEAR}-06-30' if first_half else f'{REPORTING_YEAR}-12-31'
+        elif match := find(r'(?:last|past|previous) (\d{1,2}) months?'):
+            months = max(1, min(12, int(match[0].group(1))))
+            filters['date_from'] = f'{REPORTING_YEAR}-{12 - months + 1:02d}-01'
+            filters['date_to'] = f'{REPORTING_YEAR}-12-31'
+        else:
+            month_pattern = '|'.join(sorted(MONTHS, key=len, reverse=True))
+            found = find(rf'({month_pattern})(?:\s*{year})?')
+            if found:
+                months = sorted(MONTHS[m.group(1)] for m in found)
+                filters['date_from'] = f'{REPORTING_YEAR}-{months[0]:02d}-01'
+                last_day = calendar.monthrange(REPORTING_YEAR, months[-1])[1]
+                filters['date_to'] = f'{REPORTING_YEAR}-{months[-1]:02d}-{last_day}'
+        if not other_year:
+            find(rf'(?:this|full|whole|entire) year|{year}|ytd|year to date|annual')
+
+        # Dimensions; a filter holds one value, so naming several ("North and South") is left to the LLM
+        several = []
+        match = find('|'.join(r.lower() for r in REGIONS))
+        if len({m.group(0) for m in match}) == 1:
+            filters['region'] = match[0].group(0).title()
+        elif match:
+            several.append('region')
+
+        match = find(r'product ([a-e])')
+        if len({m.group(1) for m in match}) == 1:
+            filters['product'] = f'Product {match[0].group(1).upper()}'
+        elif match:
+            several.append('product')
+
+        match = find('|'.join(INDUSTRIES) + r'|finance (?:sector|industry|companies|clients|customers)')
+        # Industry words are blanked out before the report type is classified ("finance industry sales")
+        classified = query
+        for m in match:
+            classified = classified[:m.start()] + ' ' * (m.end() - m.start()) + classified[m.end():]
+        industries = {'Finance' if m.group(0).startswith('finance ') else INDUSTRIES[m.group(0)] for m in match}
+        if len(industries) == 1:
+            filters['industry'] = industries.pop()
+        elif industries:
+            several.append('industry')
+
+        match = [m for m in re.finditer(
+            r'(?:\b(?:over|above|more than|greater than|exceeding|at least)|>=?)\s*(\$)?\s*(\d[\d,]*(?:\.\d+)?)'
+            rf'\s*(k|m|thousand|million)?(?!\w)(?!\s*(?:{TIME_UNITS})\b)', query)
+            if m.group(1) or m.group(3) or re.search(rf'(?:\b(?:{AMOUNT_CONTEXT})\b)|\$', query)]
+        if match:
+            spans.append(match[0].span())
+            number, unit = match[0].group(2), match[0].group(3)
+            amount = float(number.replace(',', ''))
+            if unit in ('k', 'thousand'):
+                amount *= 1_000
+            elif unit in ('m', 'million'):
+                amount *= 1_000_000
+            filters['min_amount'] = amount
+
+        match = find(r'(purchase|refund|payment)s?')
+        if len({m.group(1) for m in match}) == 1:
+            filters['transaction_type'] = TRANSACTION_TYPES[match[0].group(1)]
+        elif match:
+            several.append('transaction_type')
+
+        match = find('|'.join(STATUSES))
+        if len({m.group(0) for m in match}) == 1:
+            filters['status'] = STATUSES[match[0].group(0)]
+        elif match:
+            several.append('status')
+
+        # Report type and sources
+        report_type = None
+        data_sources: List[str] = []
+        for pattern, kind, sources in REPORT_KEYWORDS:
+            if find(pattern, classified):
+                report_type = report_type or kind
+                data_sources.extend(s for s in sources if s not in data_sources)
+        if filters['transaction_type'] and 'transactions' not in data_sources:
+            data_sources.append('transactions')
+
+        # Urgency and value
+        urgency = 'high' if find(URGENCY_HIGH) else 'low' if find(URGENCY_LOW) else 'normal'
+        value_impact = 'high' if find(VALUE_HIGH) or report_type == 'executive' else 'medium'
+
+        confidence = self._confidence(query, spans)
+        if report_type is None:
+            confidence *= 0.5
+        if several:
+            confidence *= 0.5
+
+        parsed_request = {
+            'report_type': report_type or 'custom',
+            'data_sources': data_sources or ['erp_sales'],
+            'filters': filters,
+            'urgency': urgency,
+            'value_impact': value_impact,
+            'report_focus': user_query,
+            'interpretation': self._interpretation(report_type or 'custom', data_sources, filters),
+            'requestor': user_context.get('full_name', 'Unknown'),
+            'department': user_context.get('department', 'Unknown'),
+            'user_role': user_context.get('role', 'Unknown')
+        }
+        return parsed_request, round(confidence, 3)
+
+    def _confidence(self, query: str, spans: List[Tuple[int, int]]) -> float:
+        """Share of meaningful words in the query explained by a rule"""
+        words = [m for m in re.finditer(r"[a-z0-9&$']+", query) if m.group(0) not in FILLER]
+        if not words:
+            return 0.0
+        covered = sum(1 for w in words if any(s < w.end() and w.start() < e for s, e in spans))
+        return covered / len(words)
+
+    def _interpretation(self, report_type: str, data_sources: List[str], filters: Dict[str, Any]) -> str:
+        applied = ', '.join(f'{k}={v}' for k, v in filters.items() if v is not None)
+        return f"{report_type.title()} report from {', '.join(data_sources) or 'erp_sales'}" + (f' filtered by {applied}' if applied else '')
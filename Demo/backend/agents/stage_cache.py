@@ -0,0 +1,105 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, Tuple
+
+import pandas as pd
+
+
+def estimate_bytes(value) -> int:
+    """Rough in-memory size of a stage output"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_bytes(k) + estimate_bytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_bytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class StageCache:
+    """Memory-bounded LRU of fetch/aggregate/analytics outputs keyed by sources, filters and data versions"""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0, 'stale_writes': 0}
+        # (stage, data_key) -> (value, size)
+        self._entries: "OrderedDict[Tuple[str, tuple], Tuple[Any, int]]" = OrderedDict()
+        # source -> data version the cached entries were computed against
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["StageCache"]:
+        if os.getenv("STAGE_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(max_bytes=int(float(os.getenv("STAGE_CACHE_MAX_MB", "256")) * 1024 * 1024))
+
+    def _invalidate_stale(self, versions: Dict[str, int]):
+        """Drop every entry that read a source whose version has moved on (versions only increase)"""
+        changed = {s for s, v in versions.items() if v > self._versions.get(s, v)}
+        for source, version in versions.items():
+            self._versions[source] = max(version, self._versions.get(source, version))
+        if not changed:
+            return
+        for entry_key in [k for k in self._entries if changed & {s for s, _ in k[1][2]}]:
+            _, size = self._entries.pop(entry_key)
+            self.bytes -= size
+            self.stats['invalidations'] += 1
+
+    def get(self, stage: str, data_key: tuple):
+        """data_key is (sources, canonical filters, ((source, version), ...)); None on a miss"""
+        entry_key = (stage, data_key)
+        with self._lock:
+            self._invalidate_stale(dict(data_key[2]))
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                self.stats['hits'] += 1
+                return self._entries[entry_key][0]
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, stage: str, data_key: tuple, value):
+        size = estimate_bytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            versions = dict(data_key[2])
+            self._invalidate_stale(versions)
+            # Computed against a version that has since moved on (an invalidation raced the compute):
+            # the key can never be hit again
+            if any(version < self._versions[source] for source, version in versions.items()):
+                self.stats['stale_writes'] += 1
+                return
+            entry_key = (stage, data_key)
+            if entry_key in self._entries:
+                return
+            self._entries[entry_key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.stats['evictions'] += 1
+
+    def get_or_compute(self, stage: str, data_key: Optional[tuple], compute: Callable[[], Any]):
+        """None as data_key (e.g. after a partial fetch) bypasses the cache"""
+        if data_key is None:
+            return compute()
+        value = self.get(stage, data_key)
+        if value is None:
+            value = compute()
+            self.put(stage, data_key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries), 'bytes': self.bytes, 'max_bytes': self.max_bytes}
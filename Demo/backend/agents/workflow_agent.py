@@ -3,13 +3,18 @@ from datetime import datetime
 import json
 
 from .llm import get_llm
+from .workflow_rules import WorkflowRuleEngine
 
 class WorkflowAgent:
 
-    def build_workflow(self, parsed_request: Dict[str, Any]) -> Dict[str, Any]:
-        """Build workflow based on parsed user request"""
-        
-        prompt = f"""Design an appropriate approval workflow for this request:
+    def __init__(self, use_cache: bool = False, llm_refinement: bool = False, deadline_seconds: float = 15):
+        self.use_cache = use_cache
+        self.deadline_seconds = deadline_seconds
+        self.llm_refinement = llm_refinement
+        self.rule_engine = WorkflowRuleEngine()
+
+    def _build_prompt(self, parsed_request: Dict[str, Any], baseline: Dict[str, Any]) -> str:
+        return f"""Refine the approval workflow for this request:
 
 Report Type: {parsed_request.get('report_type', 'custom')}
 Report Focus: {parsed_request.get('report_focus', 'General')}
@@ -26,6 +31,9 @@ Rules:
 - High urgency: Parallel approvals where possible
 - High value: Additional stakeholder reviews
 
+Baseline workflow from these rules (keep it unless the request clearly needs changes):
+{json.dumps(baseline, indent=2)}
+
 Return ONLY valid JSON:
 {{
   "name": "workflow name",
@@ -47,44 +55,65 @@ Return ONLY valid JSON:
   "reason": "Brief explanation"
 }}"""
 
+    def _parse_response(self, response_text: str) -> Dict[str, Any]:
+        response_text = response_text.strip()
+        response_text = (
+            response_text.replace("```json", "")
+                         .replace("```", "")
+                         .strip()
+        )
+
+        workflow = json.loads(response_text)
+
+        workflow["created_at"] = datetime.now().isoformat()
+        workflow["status"] = "pending"
+
+        return workflow
+
+    def _from_rules(self, parsed_request: Dict[str, Any]) -> Dict[str, Any]:
+        workflow = self.rule_engine.build(parsed_request)
+        workflow["created_at"] = datetime.now().isoformat()
+        workflow["status"] = "pending"
+        return workflow
+
+    def build_workflow(self, parsed_request: Dict[str, Any]) -> Dict[str, Any]:
+        """Build workflow based on parsed user request"""
+
+        baseline = self._from_rules(parsed_request)
+        if not self.llm_refinement:
+            return baseline
+
+        prompt = self._build_prompt(parsed_request, baseline)
+
         try:
-            llm = get_llm()
+            llm = get_llm(cache=self.use_cache, deadline=self.deadline_seconds)
 
             response = llm.invoke([
                 {"role": "user", "content": prompt}
             ])
 
-            response_text = response.content.strip()
-            response_text = (
-                response_text.replace("```json", "")
-                             .replace("```", "")
-                             .strip()
-            )
+            return self._parse_response(response.content)
+            
+        except Exception:
+            return baseline
+
+    async def build_workflow_async(self, parsed_request: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of build_workflow built on ainvoke"""
 
-            workflow = json.loads(response_text)
+        baseline = self._from_rules(parsed_request)
+        if not self.llm_refinement:
+            return baseline
 
-            workflow["created_at"] = datetime.now().isoformat()
-            workflow["status"] = "pending"
+        prompt = self._build_prompt(parsed_request, baseline)
+
+        try:
+            llm = get_llm(cache=self.use_cache, deadline=self.deadline_seconds)
+
+            response = await llm.ainvoke([
+                {"role": "user", "content": prompt}
+            ])
+
+            return self._parse_response(response.content)
 
-            return workflow
-            
         except Exception:
-            return {
-                "name": "Standard Approval Workflow",
-                "stages": [{
-                    "id": "stage_1",
-                    "name": "Manager Review",
-                    "approvers": ["Manager"],
-                    "type": "sequential",
-                    "requires": "single",
-                    "timeout_hours": 24
-                }],
-                "notifications": {
-                    "on_submit": True,
-                    "on_approval": True,
-                    "on_rejection": True
-                },
-                "reason": "Default workflow",
-                "created_at": datetime.now().isoformat(),
-                "status": "pending"
-            }
+            return baseline
@@ -0,0 +1,96 @@
+import copy
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
+
+# Approval chains per report type; anything not listed gets a single manager approval
+APPROVAL_CHAINS: Dict[str, List[str]] = {
+    'sales': ['Manager', 'Director'],
+    'financial': ['Manager', 'Finance Head', 'CFO'],
+    'executive': ['Director', 'VP', 'C-Level'],
+}
+DEFAULT_CHAIN = ['Manager']
+
+# Extra reviewers added for high value requests
+STAKEHOLDERS: Dict[str, List[str]] = {
+    'sales': ['VP Sales', 'Finance Head'],
+    'financial': ['Audit Committee'],
+    'executive': ['Board Representative'],
+}
+DEFAULT_STAKEHOLDERS = ['Department Head']
+
+TIMEOUT_HOURS = {'high': 8, 'normal': 24, 'low': 48}
+
+NOTIFICATIONS = {
+    "on_submit": True,
+    "on_approval": True,
+    "on_rejection": True
+}
+
+
+def _stage(index: int, name: str, approvers: List[str], stage_type: str, requires: str, timeout_hours: int) -> Dict[str, Any]:
+    return {
+        "id": f"stage_{index}",
+        "name": name,
+        "approvers": approvers,
+        "type": stage_type,
+        "requires": requires,
+        "timeout_hours": timeout_hours
+    }
+
+
+@lru_cache(maxsize=256)
+def _compile(report_type: str, urgency: str, value_impact: str, role: str, department: str) -> Dict[str, Any]:
+    """Compile the workflow template for one combination of inputs (memoized)"""
+    reasons = []
+    chain = APPROVAL_CHAINS.get(report_type, DEFAULT_CHAIN)
+    if report_type in APPROVAL_CHAINS:
+        reasons.append(f"{report_type.title()} reports require {' → '.join(chain)} approval")
+    else:
+        reasons.append("Simple report: single manager approval")
+
+    timeout = TIMEOUT_HOURS.get(urgency, TIMEOUT_HOURS['normal'])
+    stages = []
+    if urgency == 'high' and len(chain) > 1:
+        stages.append(_stage(1, "Expedited Parallel Review", list(chain), "parallel", "all", timeout))
+        reasons.append("High urgency: approvals run in parallel")
+    else:
+        for approver in chain:
+            name = f"{department} {approver} Review" if approver == 'Manager' and department else f"{approver} Review"
+            stages.append(_stage(len(stages) + 1, name, [approver], "sequential", "single", timeout))
+        if urgency == 'high':
+            reasons.append("High urgency: shortened approval timeout")
+
+    if value_impact == 'high':
+        stakeholders = STAKEHOLDERS.get(report_type, DEFAULT_STAKEHOLDERS)
+        stages.append(_stage(len(stages) + 1, "Stakeholder Review", list(stakeholders), "parallel", "all", timeout))
+        reasons.append("High value: additional stakeholder review")
+
+    workflow = {
+        "name": f"{report_type.title()} Approval Workflow",
+        "stages": stages,
+        "notifications": dict(NOTIFICATIONS),
+        "reason": '; '.join(reasons)
+    }
+    return workflow
+
+
+class WorkflowRuleEngine:
+    """Applies the approval policy deterministically, memoizing compiled templates"""
+
+    @staticmethod
+    def key(parsed_request: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+        return (
+            str(parsed_request.get('report_type') or 'custom').lower(),
+            str(parsed_request.get('urgency') or 'normal').lower(),
+            str(parsed_request.get('value_impact') or 'medium').lower(),
+            str(parsed_request.get('user_role') or 'Unknown'),
+            str(parsed_request.get('department') or 'General'),
+        )
+
+    def build(self, parsed_request: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a fresh copy of the compiled workflow for this request"""
+        return copy.deepcopy(_compile(*self.key(parsed_request)))
+
+    @staticmethod
+    def cache_info():
+        return _compile.cache_info()
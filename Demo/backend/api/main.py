@@ -1,8 +1,12 @@
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import timedelta
+from contextlib import asynccontextmanager
+import json
+import asyncio
 import sys
 sys.path.append('..')
 
@@ -11,8 +15,16 @@ from auth.auth_handler import (
     get_user, ACCESS_TOKEN_EXPIRE_MINUTES, Token, User
 )
 from agents.coordinator import CoordinatorAgent
+from agents.llm import llm_manager, llm_stats
 
-app = FastAPI(title="Report Generator")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release pooled LLM connections on shutdown
+    await llm_manager.aclose()
+
+app = FastAPI(title="Report Generator", lifespan=lifespan)
 
 coordinator = CoordinatorAgent()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -53,11 +65,28 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     
     return user
 
+# Roles allowed to change source data
+DATA_WRITE_ROLES = {"Director", "C-Level"}
+
+async def get_data_writer(current_user: User = Depends(get_current_user)):
+    """Current user, provided their role may append to the data sources"""
+    if current_user.role not in DATA_WRITE_ROLES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not permitted to modify source data")
+    return current_user
+
 
 # Report Generation Endpoints
 class QueryRequest(BaseModel):
     query: str
 
+def _user_context(current_user: User) -> Dict[str, Any]:
+    return {
+        'full_name': current_user.full_name,
+        'department': current_user.department,
+        'role': current_user.role,
+        'email': current_user.email
+    }
+
 @app.post("/api/reports/query")
 async def generate_report_from_query(
     request: QueryRequest,
@@ -66,14 +95,9 @@ async def generate_report_from_query(
     """Generate report from natural language query"""
     
     try:
-        user_context = {
-            'full_name': current_user.full_name,
-            'department': current_user.department,
-            'role': current_user.role,
-            'email': current_user.email
-        }
+        user_context = _user_context(current_user)
         
-        result = coordinator.process_user_query(
+        result = await coordinator.process_user_query_async(
             user_query=request.query,
             user_context=user_context
         )
@@ -86,17 +110,64 @@ async def generate_report_from_query(
             'workflow': result.get('workflow', {}),
             'data_sources_used': result.get('data_sources_used', []),
             'records_fetched': result.get('records_fetched', {}),
+            'fetch_stats': result.get('fetch_stats', {}),
             'insights': result.get('insights', []),
             'anomalies': result.get('anomalies', []),
             'forecasts': result.get('forecasts', {}),
             'aggregated_data': result.get('aggregated_data', {}),
             'report': result.get('report', ''),
+            'timings': result.get('timings', {}),
+            'prompt_metrics': result.get('prompt_metrics', {}),
             'status': result.get('status', 'unknown')
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/reports/query/stream")
+async def stream_report_from_query(
+    request: QueryRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream pipeline stages and report tokens as Server-Sent Events"""
+
+    user_context = _user_context(current_user)
+
+    async def event_stream():
+        async for event, data in coordinator.stream_user_query(
+            user_query=request.query,
+            user_context=user_context
+        ):
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+class AppendRequest(BaseModel):
+    rows: List[Dict[str, Any]]
+
+@app.post("/api/data/{source}/append")
+async def append_source_rows(
+    source: str,
+    request: AppendRequest,
+    current_user: User = Depends(get_data_writer)
+):
+    """Append a batch of rows to erp_sales or transactions (Director/C-Level only); cubes and running stats
+    follow incrementally"""
+    try:
+        result = await asyncio.to_thread(coordinator.data_agent.ingest, source, request.rows)
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**result, 'running_stats': coordinator.data_agent.running_stats()[source]}
+
+@app.get("/api/metrics")
+async def read_metrics(current_user: User = Depends(get_current_user)):
+    """Coordinator request metrics plus LLM cache and resilience stats"""
+    return {**coordinator.get_metrics(), 'llm': llm_stats()}
+
 @app.get("/api/user/me", response_model=User)
 async def read_users_me(current_user: User = Depends(get_current_user)):
     """Get current user info"""
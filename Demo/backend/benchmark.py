@@ -0,0 +1,138 @@
+"""End-to-end pipeline benchmark against the local mock LLM server.
+
+Run from the backend directory:
+
+    python benchmark.py --requests 40 --concurrency 8 --latency lognormal:800:0.4 --tokens-per-second 80
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+import statistics
+from typing import Dict, Any, List
+
+QUERIES = [
+    "Show me Q3 sales performance",
+    "Financial report for last 6 months",
+    "Top performing customers in technology sector",
+    "Sales by region with forecasts",
+    "Urgent financial analysis needed",
+    "Compare sales performance across products",
+    "CRM pipeline report for this quarter",
+    "Transaction analysis for pending orders"
+]
+
+# Stages whose time is dominated by the model round trip
+LLM_STAGES = ('parse_query', 'build_workflow', 'generate_report')
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def start_mock_server(port: int, latency: str, tokens_per_second: float):
+    import uvicorn
+    from mock_data.mock_llm_server import create_app
+
+    config = uvicorn.Config(create_app(latency, tokens_per_second), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_load(call, total: int, concurrency: int) -> List[Dict[str, Any]]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await call(QUERIES[i % len(QUERIES)])
+            result['_latency_ms'] = (time.perf_counter() - started) * 1000
+            return result
+
+    return await asyncio.gather(*[one(i) for i in range(total)])
+
+
+def summarize(label: str, results: List[Dict[str, Any]], wall_seconds: float):
+    print(f"\n== {label}: {len(results)} requests in {wall_seconds:.2f}s ({len(results) / wall_seconds:.1f} req/s)")
+    failures = [r for r in results if r.get('status') != 'completed']
+    if failures:
+        print(f"   {len(failures)} failed: {failures[0].get('error', failures[0].get('status'))}")
+
+    stages: Dict[str, List[float]] = {}
+    model_ms, overhead_ms = [], []
+    for r in results:
+        timings = r.get('timings', {})
+        for stage, ms in timings.items():
+            stages.setdefault(stage, []).append(ms)
+        llm = sum(timings.get(s, 0) for s in LLM_STAGES)
+        model_ms.append(llm)
+        overhead_ms.append(max(0.0, timings.get('total', 0) - llm))
+
+    print(f"   {'stage':<20}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+    rows = sorted(stages.items(), key=lambda kv: kv[0] == 'total')
+    rows += [('llm-bound stages', model_ms), ('pipeline overhead', overhead_ms),
+             ('end-to-end', [r['_latency_ms'] for r in results])]
+    for stage, values in rows:
+        print(f"   {stage:<20}{percentile(values, 50):>10.1f}{percentile(values, 95):>10.1f}{statistics.mean(values):>10.1f}")
+
+
+async def main(args):
+    from api.main import app, coordinator
+
+    if args.target in ("coordinator", "both"):
+        started = time.perf_counter()
+        results = await run_load(lambda q: coordinator.process_user_query_async(q, {'full_name': 'Benchmark'}),
+                                 args.requests, args.concurrency)
+        summarize("CoordinatorAgent", results, time.perf_counter() - started)
+
+    if args.target in ("api", "both"):
+        import httpx
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=300) as client:
+            token = (await client.post("/token", data={"username": "admin@tcs.com", "password": "admin123"})).json()
+            headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+            async def call(query):
+                return (await client.post("/api/reports/query", json={"query": query}, headers=headers)).json()
+
+            started = time.perf_counter()
+            results = await run_load(call, args.requests, args.concurrency)
+            summarize("FastAPI /api/reports/query", results, time.perf_counter() - started)
+
+    print(f"\nCoordinator metrics: {coordinator.get_metrics()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the report pipeline against a mock LLM")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--target", choices=["coordinator", "api", "both"], default="both")
+    parser.add_argument("--latency", default="lognormal:800:0.4", help="mock LLM latency distribution (see mock_llm_server)")
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--llm-url", help="use an already running LLM endpoint instead of starting the mock")
+    parser.add_argument("--cache", action="store_true", help="keep the LLM response cache enabled")
+    args = parser.parse_args()
+
+    # The agents read their LLM configuration at import time
+    if args.llm_url:
+        os.environ["LLM_BASE_URL"] = args.llm_url
+    else:
+        start_mock_server(args.port, args.latency, args.tokens_per_second)
+        os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    if not args.cache:
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    asyncio.run(main(args))
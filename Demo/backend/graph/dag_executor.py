@@ -0,0 +1,81 @@
+import time
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, List, Sequence
+
+
+class Node:
+    """A pipeline stage with declared input and output state keys"""
+
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str], outputs: Sequence[str], blocking: bool = False):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        # Blocking (pandas-heavy) nodes run in the default thread pool
+        self.blocking = blocking
+
+
+class DAGExecutor:
+    """Runs nodes as soon as their inputs exist, so independent branches overlap"""
+
+    def __init__(self, nodes: List[Node], initial_keys: Sequence[str] = ()):
+        self.nodes = nodes
+        self._validate(set(initial_keys))
+
+    def _validate(self, available: set):
+        producers = {}
+        for node in self.nodes:
+            for key in node.outputs:
+                if key in producers or key in available:
+                    raise ValueError(f"State key '{key}' produced more than once")
+                producers[key] = node.name
+
+        # Walk the graph in dependency order to reject missing inputs and cycles
+        pending = list(self.nodes)
+        while pending:
+            ready = [n for n in pending if set(n.inputs) <= available]
+            if not ready:
+                missing = {k for n in pending for k in n.inputs} - available
+                raise ValueError(f"Unsatisfiable or cyclic inputs: {sorted(missing)}")
+            for node in ready:
+                available.update(node.outputs)
+                pending.remove(node)
+
+    async def _run_node(self, node: Node, state: Dict[str, Any]):
+        args = [state[key] for key in node.inputs]
+        start = time.perf_counter()
+        if node.blocking:
+            value = await asyncio.to_thread(node.func, *args)
+        else:
+            value = node.func(*args)
+            if inspect.isawaitable(value):
+                value = await value
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if len(node.outputs) == 1:
+            outputs = {node.outputs[0]: value}
+        else:
+            outputs = dict(zip(node.outputs, value))
+        return outputs, elapsed_ms
+
+    async def run(self, state: Dict[str, Any]):
+        """Yield (node_name, outputs, elapsed_ms) as each node completes; `state` is updated in place"""
+        pending = list(self.nodes)
+        running: Dict[asyncio.Task, Node] = {}
+
+        try:
+            while pending or running:
+                for node in [n for n in pending if all(k in state for k in n.inputs)]:
+                    running[asyncio.create_task(self._run_node(node, state))] = node
+                    pending.remove(node)
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    node = running.pop(task)
+                    outputs, elapsed_ms = task.result()
+                    state.update(outputs)
+                    yield node.name, outputs, elapsed_ms
+        finally:
+            for task in running:
+                task.cancel()
@@ -1,71 +1,43 @@
-# from typing import TypedDict, Annotated
-# from langgraph.graph import StateGraph, END
-# import operator
+from .dag_executor import Node, DAGExecutor
 
-# class WorkflowState(TypedDict):
-#     request: dict
-#     data: dict
-#     aggregated: dict
-#     anomalies: list
-#     insights: list
-#     forecasts: dict
-#     report: str
-#     workflow: dict
-#     status: str
-#     errors: Annotated[list, operator.add]
 
-# def create_workflow_graph(coordinator):
-#     """Create LangGraph workflow"""
-    
-#     def fetch_data_node(state: WorkflowState):
-#         data = coordinator.data_agent.fetch_data(
-#             report_type=state['request'].get('report_type', 'sales'),
-#             filters=state['request'].get('filters', {})
-#         )
-#         return {'data': data}
-    
-#     def aggregate_node(state: WorkflowState):
-#         aggregated = coordinator.data_agent.aggregate_data(state['data'])
-#         return {'aggregated': aggregated}
-    
-#     def analytics_node(state: WorkflowState):
-#         anomalies = coordinator.analytics_agent.detect_anomalies(state['data'])
-#         insights = coordinator.analytics_agent.generate_insights(state['data'], state['aggregated'])
-#         forecasts = coordinator.analytics_agent.forecast_trends(state['data'])
-#         return {
-#             'anomalies': anomalies,
-#             'insights': insights,
-#             'forecasts': forecasts
-#         }
-    
-#     def workflow_build_node(state: WorkflowState):
-#         workflow = coordinator.workflow_agent.build_workflow(state['request'])
-#         return {'workflow': workflow}
-    
-#     def report_gen_node(state: WorkflowState):
-#         report = coordinator.report_agent.generate_report(
-#             report_type=state['request'].get('report_type', 'sales'),
-#             aggregated_data=state['aggregated'],
-#             insights=state['insights'],
-#             anomalies=state['anomalies'],
-#             forecasts=state['forecasts']
-#         )
-#         return {'report': report, 'status': 'completed'}
-    
-#     # Build graph
-#     workflow = StateGraph(WorkflowState)
-    
-#     workflow.add_node("fetch_data", fetch_data_node)
-#     workflow.add_node("aggregate", aggregate_node)
-#     workflow.add_node("analytics", analytics_node)
-#     workflow.add_node("build_workflow", workflow_build_node)
-#     workflow.add_node("generate_report", report_gen_node)
-    
-#     workflow.set_entry_point("fetch_data")
-#     workflow.add_edge("fetch_data", "aggregate")
-#     workflow.add_edge("aggregate", "analytics")
-#     workflow.add_edge("analytics", "build_workflow")
-#     workflow.add_edge("build_workflow", "generate_report")
-#     workflow.add_edge("generate_report", END)
-    
-#     return workflow.compile()
\ No newline at end of file
+def create_workflow_graph(coordinator) -> DAGExecutor:
+    """Pipeline DAG: workflow building overlaps fetch → aggregate → analytics"""
+
+    # Stages downstream of fetch are pure functions of (sources, filters, data versions): data_key
+    def aggregate_node(data, parsed_request, data_key):
+        return coordinator.cached('aggregate', data_key, lambda: coordinator.data_agent.aggregate_data(
+            data, parsed_request.get('filters', {})))
+
+    def anomalies_node(data, data_key):
+        return coordinator.cached('detect_anomalies', data_key,
+                                  lambda: coordinator.analytics_agent.detect_anomalies(data))
+
+    def insights_node(data, aggregated, data_key):
+        return coordinator.cached('generate_insights', data_key,
+                                  lambda: coordinator.analytics_agent.generate_insights(data, aggregated))
+
+    def forecast_node(data, parsed_request, data_key):
+        def compute():
+            daily_sales = coordinator.data_agent.daily_sales(data, parsed_request.get('filters', {}))
+            return coordinator.analytics_agent.forecast_trends(data, daily_sales)
+        return coordinator.cached('forecast_trends', data_key, compute)
+
+    nodes = [
+        Node("parse_query", coordinator.query_parser.parse_query_async,
+             inputs=["query", "user_context"], outputs=["parsed_request"]),
+        Node("build_workflow", coordinator.workflow_agent.build_workflow_async,
+             inputs=["parsed_request"], outputs=["workflow"]),
+        Node("fetch_data", coordinator.fetch_data,
+             inputs=["parsed_request"], outputs=["data", "fetch_stats", "data_key"], blocking=True),
+        Node("aggregate", aggregate_node,
+             inputs=["data", "parsed_request", "data_key"], outputs=["aggregated"], blocking=True),
+        Node("detect_anomalies", anomalies_node,
+             inputs=["data", "data_key"], outputs=["anomalies"], blocking=True),
+        Node("generate_insights", insights_node,
+             inputs=["data", "aggregated", "data_key"], outputs=["insights"], blocking=True),
+        Node("forecast_trends", forecast_node,
+             inputs=["data", "parsed_request", "data_key"], outputs=["forecasts"], blocking=True),
+    ]
+
+    return DAGExecutor(nodes, initial_keys=["query", "user_context"])
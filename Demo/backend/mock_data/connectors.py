@@ -0,0 +1,316 @@
+import os
+import json
+import queue
+import sqlite3
+import threading
+import itertools
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .indexes import TableIndex, materialize
+from .filters import SourceFilter
+from .partitions import PartitionedTable, concat_frames, partition_freq_from_env
+from .dimensions import StarSchema
+
+TABLES = ['customers', 'sales', 'financial', 'inventory', 'opportunities', 'transactions']
+
+# Fact tables stored as time partitions by the in-memory connector: table -> date column
+PARTITIONED_TABLES = {'sales': 'date', 'transactions': 'date'}
+
+# Normalized fact tables: (date column, hash-indexed field -> column, min_amount column); the
+# dimension fields (industry, region, product) are hash-indexed on labels gathered by key
+STAR_FILTER_INPUTS = {
+    'sales': ('date', {'status': 'status'}, 'total'),
+    'transactions': ('date', {'transaction_type': 'type', 'status': 'status'}, 'amount'),
+    'opportunities': ('close_date', {}, 'value'),
+}
+
+# Aggregates that can be pushed down: name -> (function, column); column '*' counts rows
+AGGREGATES = {'sum': 'sum', 'count': 'count', 'avg': 'mean', 'min': 'min', 'max': 'max'}
+
+
+def customer_industry_map(crm_df: pd.DataFrame) -> pd.Series:
+    """customer_id -> industry, computed once per CRM snapshot"""
+    return pd.Series(crm_df['industry'].to_numpy(), index=crm_df['customer_id'].to_numpy())
+
+
+class SourceConnector:
+    """Storage behind the mock back-office systems; filters arrive already normalized"""
+
+    def read(self, table: str, filters: Dict[str, Any], stats: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def aggregate(self, table: str, measures: Dict[str, Tuple[str, str]], group_by: Sequence[str] = (),
+                  filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def append(self, table: str, batch: pd.DataFrame):
+        """Add rows; reads already in progress keep seeing the data as it was"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class InMemoryConnector(SourceConnector):
+    """Frames held in process memory, filtered through positional indexes; fact tables optionally
+    time-partitioned and, with a StarSchema, stored as keys into its dimensions"""
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], partition_freq: Optional[str] = None,
+                 star: Optional[StarSchema] = None):
+        self._customer_industry = customer_industry_map(frames['customers'])
+        self._star = star
+        self._lock = threading.Lock()
+        # table -> (frame, filter) or PartitionedTable of such segments; replaced whole on append,
+        # so a read never mixes versions
+        self._tables = {}
+        for table, df in frames.items():
+            if star is not None and table in star.dropped:
+                df, denormalized = star.split(table, df), df
+                star.record(table, denormalized, df)
+            if partition_freq and table in PARTITIONED_TABLES:
+                self._tables[table] = PartitionedTable.split(df, PARTITIONED_TABLES[table], partition_freq,
+                                                             lambda rows, t=table: self._build(t, rows))
+            else:
+                self._tables[table] = self._build(table, df)
+
+    def _build(self, table: str, df: pd.DataFrame):
+        date_column, hash_columns, columns = self._filter_inputs(table, df)
+        index = TableIndex(df, date_column, hash_columns) if date_column or hash_columns else None
+        return df, SourceFilter(len(df), index, columns)
+
+    def _extend(self, table: str, segment, batch: pd.DataFrame):
+        """Copy-on-write: indexes and mask columns are extended, not rebuilt"""
+        df, source_filter = segment
+        _, hash_columns, columns = self._filter_inputs(table, batch)
+        index = source_filter.index.append(batch, hash_columns) if source_filter.index is not None else None
+        return concat_frames([df, batch]), source_filter.append(len(batch), index, columns)
+
+    def _filter_inputs(self, table: str, df: pd.DataFrame):
+        """(date column, hash-indexed columns, mask columns) for a table or a batch appended to it"""
+        if self._star is not None and table in self._star.dropped:
+            date_column, hashed, amount = STAR_FILTER_INPUTS[table]
+            hash_columns = {field: df[column] for field, column in hashed.items()}
+            return date_column, {**self._star.filter_labels(table, df), **hash_columns}, {'min_amount': df[amount]}
+        if table == 'customers':
+            return None, {'industry': df['industry']}, {'min_amount': df['deal_value']}
+        if table == 'sales':
+            return 'date', {
+                'industry': df['customer_id'].map(self._customer_industry),
+                'region': df['region'],
+                'product': df['product'],
+                'status': df['status']
+            }, {'min_amount': df['total']}
+        if table == 'financial':
+            # A month row overlaps [date_from, date_to] when it ends after date_from and starts before date_to
+            month_start = pd.to_datetime(df['month'], format='%Y-%m')
+            return None, None, {'date_from': month_start + pd.offsets.MonthEnd(0), 'date_to': month_start}
+        if table == 'opportunities':
+            return 'close_date', {
+                'industry': df['customer_id'].map(self._customer_industry)
+            }, {'min_amount': df['value']}
+        if table == 'transactions':
+            return 'date', {
+                'industry': df['customer_id'].map(self._customer_industry),
+                'transaction_type': df['type'],
+                'status': df['status']
+            }, {'min_amount': df['amount']}
+        # Inventory: stock levels are a point-in-time snapshot; none of the parsed filters describe them
+        return None, None, None
+
+    def read(self, table, filters, stats=None):
+        stored = self._tables[table]
+        if isinstance(stored, PartitionedTable):
+            df = stored.read(filters, stats)
+        else:
+            df, source_filter = stored
+            df = materialize(df, source_filter.select(filters, stats))
+        if self._star is None:
+            return df
+        # Dimension attributes come back by key, for the returned rows only
+        return self._star.join(table, df)
+
+    def append(self, table, batch):
+        """The new segment (or partitioned table) is built aside, then swapped in"""
+        if self._star is not None:
+            batch = self._star.split(table, batch)
+        with self._lock:
+            stored = self._tables[table]
+            if isinstance(stored, PartitionedTable):
+                self._tables[table] = stored.append(batch, lambda rows: self._build(table, rows),
+                                                    lambda segment, rows: self._extend(table, segment, rows))
+            else:
+                self._tables[table] = self._extend(table, stored, batch)
+
+    def aggregate(self, table, measures, group_by=(), filters=None):
+        df = self.read(table, filters or {})
+        _validate_aggregate(table, measures, group_by, df.columns)
+        named = {}
+        for name, (func, column) in measures.items():
+            named[name] = (df.columns[0], 'size') if column == '*' else (column, AGGREGATES[func])
+        if group_by:
+            return df.groupby(list(group_by), observed=True, sort=True).agg(**named).reset_index()
+        return df.assign(_all=0).groupby('_all').agg(**named).reset_index(drop=True)
+
+
+def _validate_aggregate(table, measures, group_by, columns):
+    for name, (func, column) in measures.items():
+        if func not in AGGREGATES:
+            raise ValueError(f"Unsupported aggregate '{func}'")
+        if column not in columns and not (column == '*' and func == 'count'):
+            raise ValueError(f"Unknown column '{column}' in table '{table}'")
+        if not name.isidentifier():
+            raise ValueError(f"Invalid measure name '{name}'")
+    for column in group_by:
+        if column not in columns:
+            raise ValueError(f"Unknown group-by column '{column}' in table '{table}'")
+
+
+def _eq(column: str) -> str:
+    return f"{column} = ? COLLATE NOCASE"
+
+
+def _dates(column: str) -> Dict[str, str]:
+    return {'date_from': f"{column} >= ?", 'date_to': f"{column} <= ?"}
+
+
+# filter field -> SQL predicate with one placeholder, per table
+SQL_FILTERS = {
+    'customers': {'industry': _eq('industry'), 'min_amount': "deal_value >= ?"},
+    'sales': {**_dates('date'), 'industry': _eq('industry'), 'region': _eq('region'), 'product': _eq('product'),
+              'status': _eq('status'), 'min_amount': "total >= ?"},
+    'financial': {'date_from': "month >= ?", 'date_to': "month <= ?"},
+    'inventory': {},
+    'opportunities': {**_dates('close_date'), 'min_amount': "value >= ?",
+                      'industry': "customer_id IN (SELECT customer_id FROM customers WHERE industry = ? COLLATE NOCASE)"},
+    'transactions': {**_dates('date'), 'industry': _eq('industry'), 'transaction_type': _eq('type'),
+                     'status': _eq('status'), 'min_amount': "amount >= ?"},
+}
+SQL_INDEXES = {
+    'customers': ['customer_id', 'industry'],
+    'sales': ['date', 'industry', 'region', 'product', 'status'],
+    'financial': ['month'],
+    'inventory': [],
+    'opportunities': ['close_date', 'customer_id'],
+    'transactions': ['date', 'industry', 'type', 'status'],
+}
+DATE_COLUMNS = {'customers': ['last_contact'], 'sales': ['date'], 'opportunities': ['close_date'], 'transactions': ['date']}
+
+_memory_names = itertools.count()
+
+
+class SQLiteConnector(SourceConnector):
+    """Local stand-in for the back-office databases: pooled connections, indexed tables, SQL pushdown"""
+
+    def __init__(self, path: str = ":memory:", pool_size: int = 4):
+        if path == ":memory:":
+            # A named shared-cache database lets every pooled connection see the same tables
+            self.path, uri = f"file:mock_sources_{next(_memory_names)}?mode=memory&cache=shared", True
+        else:
+            self.path, uri = path, False
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            conn = sqlite3.connect(self.path, uri=uri, check_same_thread=False)
+            if not uri:
+                conn.execute("PRAGMA journal_mode=WAL")
+            self._pool.put(conn)
+        self._columns: Dict[str, list] = {}
+        self._row_counts: Dict[str, int] = {}
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def load(self, frames: Dict[str, pd.DataFrame], fingerprint: Optional[str] = None):
+        """Write the frames into indexed tables, unless a database with the same fingerprint and no
+        appended rows exists; rollups and summaries are built from `frames`, so the tables must hold exactly them"""
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS _meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = conn.execute("SELECT value FROM _meta WHERE key = 'fingerprint'").fetchone()
+            appends = conn.execute("SELECT value FROM _meta WHERE key = 'appends'").fetchone()
+            if fingerprint is None or row is None or row[0] != fingerprint or appends is None or appends[0] != '0':
+                for table in TABLES:
+                    frames[table].to_sql(table, conn, if_exists='replace', index=False, chunksize=50_000)
+                    for column in SQL_INDEXES[table]:
+                        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+                conn.execute("ANALYZE")
+                conn.execute("INSERT OR REPLACE INTO _meta VALUES ('fingerprint', ?)", (fingerprint,))
+                conn.execute("INSERT OR REPLACE INTO _meta VALUES ('appends', '0')")
+                conn.commit()
+
+            for table in TABLES:
+                self._columns[table] = [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+                self._row_counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return self
+
+    def _where(self, table: str, filters: Dict[str, Any]):
+        clauses, params = [], []
+        for field, value in filters.items():
+            if field not in SQL_FILTERS[table]:
+                continue
+            if isinstance(value, pd.Timestamp):
+                value = value.strftime('%Y-%m') if table == 'financial' else value.strftime('%Y-%m-%d %H:%M:%S')
+            clauses.append(SQL_FILTERS[table][field])
+            params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def read(self, table, filters, stats=None):
+        where, params = self._where(table, filters)
+        sql = f"SELECT * FROM {table}{where}"
+        with self._connection() as conn:
+            df = pd.read_sql_query(sql, conn, params=params, parse_dates=DATE_COLUMNS.get(table))
+        if stats is not None:
+            scanned = self._row_counts.get(table, 0)
+            stats.update({
+                'rows_scanned': scanned,
+                'rows_returned': len(df),
+                'selectivity': round(len(df) / scanned, 4) if scanned else 0.0,
+                'applied': {f: {'via': 'sql'} for f in filters if f in SQL_FILTERS[table]},
+                'not_applicable': sorted(f for f in filters if f not in SQL_FILTERS[table]),
+                'sql': sql
+            })
+        return df
+
+    def append(self, table, batch):
+        """One transaction per batch; other pooled connections see all of it or none of it"""
+        with self._connection() as conn:
+            with conn:
+                batch[self._columns[table]].to_sql(table, conn, if_exists='append', index=False, chunksize=50_000)
+                # The tables no longer match the frames they were loaded from; the next load rebuilds them
+                conn.execute("UPDATE _meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'appends'")
+            self._row_counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def aggregate(self, table, measures, group_by=(), filters=None):
+        _validate_aggregate(table, measures, group_by, self._columns[table])
+        selected = list(group_by) + [
+            f"{func.upper()}({column}) AS {name}" for name, (func, column) in measures.items()
+        ]
+        where, params = self._where(table, filters or {})
+        sql = f"SELECT {', '.join(selected)} FROM {table}{where}"
+        if group_by:
+            sql += f" GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}"
+        with self._connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+def connector_from_env(frames: Dict[str, pd.DataFrame], fingerprint: Optional[Dict[str, Any]] = None,
+                       star: Optional[StarSchema] = None) -> SourceConnector:
+    """DATA_CONNECTOR=memory (default) or sqlite; DATA_SQLITE_PATH defaults to an in-memory database.
+    In memory, sales and transactions are split per DATA_PARTITION_FREQ (month by default) and fact
+    tables are normalized against `star`; SQLite keeps its denormalized, indexed tables"""
+    kind = os.getenv("DATA_CONNECTOR", "memory").lower()
+    if kind == "sqlite":
+        connector = SQLiteConnector(os.getenv("DATA_SQLITE_PATH", ":memory:"),
+                                    pool_size=int(os.getenv("DATA_SQLITE_POOL_SIZE", "4")))
+        return connector.load(frames, json.dumps(fingerprint, sort_keys=True) if fingerprint else None)
+    return InMemoryConnector(frames, partition_freq=partition_freq_from_env(), star=star)
@@ -2,13 +2,136 @@ from faker import Faker
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import os
+import json
 import random
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # batch mode falls back to Python string objects
+    pa = None
+
 fake = Faker()
 
+INDUSTRIES = ['Technology', 'Finance', 'Healthcare', 'Retail', 'Manufacturing']
+CRM_STAGES = ['Lead', 'Qualified', 'Proposal', 'Negotiation', 'Closed Won', 'Closed Lost']
+PRODUCTS = ['Product A','Product B','Product C','Product D','Product E']
+REGIONS = ['North','South','East','West','Central']
+SALES_STATUSES = ['Completed','Pending','Shipped']
+OPPORTUNITY_STAGES = ['Prospecting','Qualification','Proposal','Negotiation','Closed Won']
+PROBABILITIES = [10,25,50,75,90,100]
+TRANSACTION_TYPES = ['Purchase','Sale','Refund','Payment']
+TRANSACTION_STATUSES = ['Completed','Pending','Failed','Processing']
+
+# Faker strings are drawn once into vocabularies of this size for batch generation
+VOCABULARY_SIZE = 2000
+
+# byte -> its two lower-case hex characters, as one little-endian uint16
+_HEX_PAIRS = np.array([ord(f'{b:02x}'[0]) | (ord(f'{b:02x}'[1]) << 8) for b in range(256)], dtype='<u2')
+_DIGITS = np.frombuffer(b'0123456789', dtype=np.uint8)
+_LETTERS = np.frombuffer(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ', dtype=np.uint8)
+
+
+def _fixed_width_strings(chars: np.ndarray):
+    """(n, width) uint8 ASCII buffer -> string array without per-row Python objects"""
+    n, width = chars.shape
+    if pa is None:
+        return chars.view(f'S{width}').ravel().astype(str).astype(object)
+    large = width * n >= 2 ** 31
+    offsets = np.arange(0, width * (n + 1), width, dtype=np.int64 if large else np.int32)
+    array = pa.Array.from_buffers(pa.large_string() if large else pa.string(), n,
+                                  [None, pa.py_buffer(offsets), pa.py_buffer(np.ascontiguousarray(chars))])
+    return pd.arrays.ArrowStringArray(array.cast(pa.string()) if large else array)
+
+
+def _uuid4_array(rng: np.random.Generator, n: int):
+    """n random UUID4 strings built from one block of random bytes"""
+    raw = np.frombuffer(rng.bytes(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    hexed = _HEX_PAIRS[raw].view(np.uint8).reshape(n, 32)
+    out = np.full((n, 36), ord('-'), dtype=np.uint8)
+    out[:, 0:8], out[:, 9:13], out[:, 14:18] = hexed[:, 0:8], hexed[:, 8:12], hexed[:, 12:16]
+    out[:, 19:23], out[:, 24:36] = hexed[:, 16:20], hexed[:, 20:32]
+    return _fixed_width_strings(out)
+
+
+def _references(rng: np.random.Generator, n: int):
+    """Vectorized equivalent of fake.bothify('TXN-####-????')"""
+    out = np.empty((n, 13), dtype=np.uint8)
+    out[:, 0:4] = np.frombuffer(b'TXN-', dtype=np.uint8)
+    out[:, 4:8] = _DIGITS[rng.integers(0, 10, size=(n, 4), dtype=np.uint8)]
+    out[:, 8] = ord('-')
+    out[:, 9:13] = _LETTERS[rng.integers(0, len(_LETTERS), size=(n, 4), dtype=np.uint8)]
+    return _fixed_width_strings(out)
+
+
+def _pick(rng: np.random.Generator, values, n: int):
+    return _take(np.asarray(values, dtype=object), rng.integers(0, len(values), n))
+
+
+def _take(values, positions: np.ndarray):
+    """Gather strings by position, staying in Arrow memory when available"""
+    if pa is None:
+        return np.asarray(values, dtype=object)[positions]
+    if not isinstance(values, pa.Array):
+        values = pa.array(np.asarray(values, dtype=object), type=pa.string())
+    return pd.arrays.ArrowStringArray(values.take(pa.array(positions)))
+
+
+def _column(df: pd.DataFrame, column: str, positions: np.ndarray):
+    """Gather a CRM string attribute for each generated row"""
+    return _take(df[column].to_numpy(dtype=object), positions)
+
+
+def _vocabulary(faker: Faker, factory: str, size: int) -> np.ndarray:
+    return np.array([getattr(faker, factory)() for _ in range(size)], dtype=object)
+
+
+def _days_2025(rng: np.random.Generator, n: int, num_days: int = 365) -> np.ndarray:
+    return np.datetime64('2025-01-01', 'ns') + rng.integers(0, num_days, n).astype('timedelta64[D]')
+
 class DataGenerator:
     """Generate interlinked mock data for 2025"""
     
+    @staticmethod
+    def seed(seed: int):
+        """Make subsequent generation reproducible"""
+        random.seed(seed)
+        np.random.seed(seed)
+        fake.seed_instance(seed)
+
+    @staticmethod
+    def generate_datasets(sizes: dict, seed: int = None, batch: bool = True) -> dict:
+        """Generate every linked dataset in one go (optionally seeded); batch mode is vectorized"""
+        if batch:
+            rng = np.random.default_rng(seed)
+            faker = Faker()
+            faker.seed_instance(seed)
+            crm_df = DataGenerator.generate_crm_data_batch(sizes['crm'], rng=rng, faker=faker)
+            return {
+                'crm': crm_df,
+                'sales': DataGenerator.generate_sales_data_batch(crm_df, sizes['sales'], rng=rng),
+                'financial': DataGenerator.generate_financial_data_batch(rng=rng),
+                'inventory': DataGenerator.generate_inventory_data_batch(sizes['inventory'], rng=rng, faker=faker),
+                'opportunities': DataGenerator.generate_opportunities_batch(crm_df, sizes['opportunities'], rng=rng, faker=faker),
+                'transactions': DataGenerator.generate_business_transactions_batch(crm_df, sizes['transactions'], rng=rng, faker=faker)
+            }
+
+        if seed is not None:
+            DataGenerator.seed(seed)
+        crm_df = DataGenerator.generate_crm_data(num_customers=sizes['crm'])
+        return {
+            'crm': crm_df,
+            'sales': DataGenerator.generate_sales_data(crm_df, num_records=sizes['sales']),
+            'financial': DataGenerator.generate_financial_data(num_records=sizes['financial']),
+            'inventory': DataGenerator.generate_inventory_data(num_records=sizes['inventory']),
+            'opportunities': DataGenerator.generate_opportunities(crm_df, num_records=sizes['opportunities']),
+            'transactions': DataGenerator.generate_business_transactions(crm_df, num_records=sizes['transactions'])
+        }
+
     @staticmethod
     def generate_crm_data(num_customers=50):
         """Generate CRM customers"""
@@ -21,9 +144,9 @@ class DataGenerator:
                 'contact_person': fake.name(),
                 'email': fake.email(),
                 'phone': fake.phone_number(),
-                'industry': random.choice(['Technology', 'Finance', 'Healthcare', 'Retail', 'Manufacturing']),
+                'industry': random.choice(INDUSTRIES),
                 'deal_value': round(random.uniform(10000, 500000), 2),
-                'stage': random.choice(['Lead', 'Qualified', 'Proposal', 'Negotiation', 'Closed Won', 'Closed Lost']),
+                'stage': random.choice(CRM_STAGES),
                 'last_contact': last_contact,
                 'account_manager': fake.name()
             })
@@ -49,13 +172,13 @@ class DataGenerator:
                 'customer': customer['company_name'],
                 'customer_id': customer['customer_id'],
                 'industry': customer['industry'],
-                'product': random.choice(['Product A','Product B','Product C','Product D','Product E']),
+                'product': random.choice(PRODUCTS),
                 'quantity': quantity,
                 'unit_price': unit_price,
                 'total': quantity*unit_price,
-                'region': random.choice(['North','South','East','West','Central']),
+                'region': random.choice(REGIONS),
                 'sales_rep': customer['account_manager'],
-                'status': random.choice(['Completed','Pending','Shipped'])
+                'status': random.choice(SALES_STATUSES)
             })
         return pd.DataFrame(data)
 
@@ -104,8 +227,8 @@ class DataGenerator:
                 'customer_id': customer['customer_id'],  # link key
                 'opportunity_name': fake.catch_phrase(),
                 'value': round(random.uniform(50000, 1000000), 2),
-                'stage': random.choice(['Prospecting','Qualification','Proposal','Negotiation','Closed Won']),
-                'probability': random.choice([10,25,50,75,90,100]),
+                'stage': random.choice(OPPORTUNITY_STAGES),
+                'probability': random.choice(PROBABILITIES),
                 'close_date': close_date,
                 'owner': customer['account_manager']
             })
@@ -128,10 +251,213 @@ class DataGenerator:
                 'customer': customer['company_name'],
                 'customer_id': customer['customer_id'],
                 'industry': customer['industry'],
-                'type': random.choice(['Purchase','Sale','Refund','Payment']),
+                'type': random.choice(TRANSACTION_TYPES),
                 'amount': round(random.uniform(100,50000),2),
-                'status': random.choice(['Completed','Pending','Failed','Processing']),
+                'status': random.choice(TRANSACTION_STATUSES),
                 'reference': fake.bothify(text='TXN-####-????'),
                 'description': fake.sentence()
             })
-        return pd.DataFrame(data)
\ No newline at end of file
+        return pd.DataFrame(data)
+
+    # Batch mode: every column is drawn as a NumPy array in one shot
+
+    @staticmethod
+    def generate_crm_data_batch(num_customers=50, rng=None, faker=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        faker = faker or fake
+        size = min(num_customers, VOCABULARY_SIZE)
+        people = _vocabulary(faker, 'name', size)
+        return pd.DataFrame({
+            'customer_id': _uuid4_array(rng, num_customers),
+            'company_name': _pick(rng, _vocabulary(faker, 'company', size), num_customers),
+            'contact_person': _pick(rng, people, num_customers),
+            'email': _pick(rng, _vocabulary(faker, 'email', size), num_customers),
+            'phone': _pick(rng, _vocabulary(faker, 'phone_number', size), num_customers),
+            'industry': _pick(rng, INDUSTRIES, num_customers),
+            'deal_value': np.round(rng.uniform(10000, 500000, num_customers), 2),
+            'stage': _pick(rng, CRM_STAGES, num_customers),
+            'last_contact': _days_2025(rng, num_customers),
+            'account_manager': _pick(rng, people, num_customers)
+        })
+
+    @staticmethod
+    def generate_sales_data_batch(crm_df, num_records=200, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        customers = rng.integers(0, len(crm_df), num_records)
+        quantity = rng.integers(1, 101, num_records)
+        unit_price = np.round(rng.uniform(10, 1000, num_records), 2)
+        return pd.DataFrame({
+            'transaction_id': _uuid4_array(rng, num_records),
+            'date': _days_2025(rng, num_records),
+            'customer': _column(crm_df, 'company_name', customers),
+            'customer_id': _column(crm_df, 'customer_id', customers),
+            'industry': _column(crm_df, 'industry', customers),
+            'product': _pick(rng, PRODUCTS, num_records),
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'total': quantity * unit_price,
+            'region': _pick(rng, REGIONS, num_records),
+            'sales_rep': _column(crm_df, 'account_manager', customers),
+            'status': _pick(rng, SALES_STATUSES, num_records)
+        })
+
+    @staticmethod
+    def generate_financial_data_batch(rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        revenue = rng.uniform(800000, 1500000, 12)
+        expenses = revenue * rng.uniform(0.6, 0.8, 12)
+        return pd.DataFrame({
+            'month': [f'2025-{m:02d}' for m in range(1, 13)],
+            'revenue': np.round(revenue, 2),
+            'expenses': np.round(expenses, 2),
+            'profit': np.round(revenue - expenses, 2),
+            'profit_margin': np.round((revenue - expenses) / revenue * 100, 2)
+        })
+
+    @staticmethod
+    def generate_inventory_data_batch(num_records=50, rng=None, faker=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        faker = faker or fake
+        words = [w.capitalize() for w in _vocabulary(faker, 'word', min(num_records, VOCABULARY_SIZE))]
+        names = pd.Series(_pick(rng, words, num_records)) + ' ' + pd.Series(_pick(rng, ['Pro','Plus','Elite','Basic'], num_records))
+        return pd.DataFrame({
+            'product_id': _uuid4_array(rng, num_records),
+            'product_name': names.to_numpy(dtype=object),
+            'category': _pick(rng, ['Electronics','Furniture','Supplies','Equipment'], num_records),
+            'quantity_on_hand': rng.integers(0, 501, num_records),
+            'reorder_level': rng.integers(50, 101, num_records),
+            'unit_cost': np.round(rng.uniform(10, 200, num_records), 2),
+            'warehouse': _pick(rng, ['Warehouse A','Warehouse B','Warehouse C'], num_records)
+        })
+
+    @staticmethod
+    def generate_opportunities_batch(crm_df, num_records=80, rng=None, faker=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        faker = faker or fake
+        customers = rng.integers(0, len(crm_df), num_records)
+        return pd.DataFrame({
+            'opportunity_id': _uuid4_array(rng, num_records),
+            'customer': _column(crm_df, 'company_name', customers),
+            'customer_id': _column(crm_df, 'customer_id', customers),
+            'opportunity_name': _pick(rng, _vocabulary(faker, 'catch_phrase', min(num_records, VOCABULARY_SIZE)), num_records),
+            'value': np.round(rng.uniform(50000, 1000000, num_records), 2),
+            'stage': _pick(rng, OPPORTUNITY_STAGES, num_records),
+            'probability': np.asarray(PROBABILITIES)[rng.integers(0, len(PROBABILITIES), num_records)],
+            'close_date': _days_2025(rng, num_records),
+            'owner': _column(crm_df, 'account_manager', customers)
+        })
+
+    @staticmethod
+    def generate_business_transactions_batch(crm_df, num_records=150, rng=None, faker=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        faker = faker or fake
+        customers = rng.integers(0, len(crm_df), num_records)
+        return pd.DataFrame({
+            'transaction_id': _uuid4_array(rng, num_records),
+            'date': _days_2025(rng, num_records),
+            'customer': _column(crm_df, 'company_name', customers),
+            'customer_id': _column(crm_df, 'customer_id', customers),
+            'industry': _column(crm_df, 'industry', customers),
+            'type': _pick(rng, TRANSACTION_TYPES, num_records),
+            'amount': np.round(rng.uniform(100, 50000, num_records), 2),
+            'status': _pick(rng, TRANSACTION_STATUSES, num_records),
+            'reference': _references(rng, num_records),
+            'description': _pick(rng, _vocabulary(faker, 'sentence', min(num_records, VOCABULARY_SIZE)), num_records)
+        })
+
+    # Streaming mode: fixed-size chunks with one independent seeded stream per chunk
+
+    @staticmethod
+    def iter_chunks(kind: str, crm_df, total_records: int, chunk_size: int = 1_000_000, seed: int = 42, chunks=None):
+        """Yield (chunk_number, DataFrame) for a fact table larger than memory"""
+        num_chunks = -(-total_records // chunk_size)
+        streams = np.random.SeedSequence(seed).spawn(num_chunks)
+        faker = Faker()
+        for chunk in (range(num_chunks) if chunks is None else chunks):
+            faker.seed_instance(seed)  # identical vocabularies in every worker
+            rows = min(chunk_size, total_records - chunk * chunk_size)
+            yield chunk, STREAMING_KINDS[kind](crm_df, rows, np.random.default_rng(streams[chunk]), faker)
+
+    @staticmethod
+    def write_partitioned(kind: str, total_records: int, path: str, crm_df=None, num_customers: int = 100_000,
+                          chunk_size: int = 1_000_000, seed: int = 42, workers: int = 1) -> dict:
+        """Stream `kind` to path/<kind>/month=YYYY-MM/part-NNNNN.parquet against one CRM dimension;
+        the run's manifest goes to path/<kind>.manifest.json"""
+        if pa is None:
+            raise ImportError("pyarrow is required for partitioned output")
+
+        if crm_df is None:
+            faker = Faker()
+            faker.seed_instance(seed)
+            crm_df = DataGenerator.generate_crm_data_batch(num_customers, rng=np.random.default_rng(seed), faker=faker)
+        crm_path = os.path.join(path, 'crm', 'part-00000.parquet')
+        os.makedirs(os.path.dirname(crm_path), exist_ok=True)
+        pq.write_table(pa.Table.from_pandas(crm_df, preserve_index=False), crm_path)
+
+        num_chunks = -(-total_records // chunk_size)
+        args = (kind, crm_path, total_records, chunk_size, seed, path)
+        if workers > 1:
+            # Each worker re-reads the CRM file, so every chunk links to the same customers
+            with ProcessPoolExecutor(workers) as pool:
+                written = list(pool.map(_write_chunks, [args + (list(range(w, num_chunks, workers)),) for w in range(workers)]))
+        else:
+            written = [_write_chunks(args + (list(range(num_chunks)),))]
+
+        manifest = {
+            'kind': kind,
+            'total_records': total_records,
+            'chunk_size': chunk_size,
+            'num_chunks': num_chunks,
+            'seed': seed,
+            'crm_rows': len(crm_df),
+            'partitions': sorted({p for files in written for p in files})
+        }
+        # Beside the dataset directory, not in it: pyarrow readers treat every file under <kind>/ as data
+        with open(os.path.join(path, f'{kind}.manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+STREAMING_KINDS = {
+    'sales': lambda crm, n, rng, faker: DataGenerator.generate_sales_data_batch(crm, n, rng=rng),
+    'transactions': lambda crm, n, rng, faker: DataGenerator.generate_business_transactions_batch(crm, n, rng=rng, faker=faker),
+    'opportunities': lambda crm, n, rng, faker: DataGenerator.generate_opportunities_batch(crm, n, rng=rng, faker=faker),
+}
+PARTITION_COLUMNS = {'sales': 'date', 'transactions': 'date', 'opportunities': 'close_date'}
+
+
+def _write_chunks(args) -> list:
+    """Worker: generate the assigned chunks and write one file per month partition"""
+    kind, crm_path, total_records, chunk_size, seed, path, chunks = args
+    crm_df = pq.read_table(crm_path).to_pandas()
+    partitions = set()
+    for chunk, df in DataGenerator.iter_chunks(kind, crm_df, total_records, chunk_size, seed, chunks):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        months, inverse = np.unique(df[PARTITION_COLUMNS[kind]].to_numpy().astype('datetime64[M]'), return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.searchsorted(inverse[order], np.arange(len(months) + 1))
+        for i, month in enumerate(months):
+            partition = f"month={str(month)}"
+            directory = os.path.join(path, kind, partition)
+            os.makedirs(directory, exist_ok=True)
+            pq.write_table(table.take(order[bounds[i]:bounds[i + 1]]), os.path.join(directory, f'part-{chunk:05d}.parquet'))
+            partitions.add(partition)
+    return sorted(partitions)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream synthetic data to partitioned Parquet files")
+    parser.add_argument('--kind', choices=sorted(STREAMING_KINDS), default='transactions')
+    parser.add_argument('--records', type=int, required=True)
+    parser.add_argument('--path', default='generated_data')
+    parser.add_argument('--customers', type=int, default=100_000)
+    parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    manifest = DataGenerator.write_partitioned(args.kind, args.records, args.path, num_customers=args.customers,
+                                               chunk_size=args.chunk_size, seed=args.seed, workers=args.workers)
+    print(json.dumps({k: v for k, v in manifest.items() if k != 'partitions'}, indent=2))
@@ -0,0 +1,189 @@
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Sequence
+
+# fact table -> denormalized column -> (dimension, attribute, key column); the column is dropped from
+# the fact table when it is fully determined by the key, and gathered back from the dimension on read
+FACT_ATTRIBUTES = {
+    'sales': {
+        'customer': ('customer', 'company_name', 'customer_id'),
+        'industry': ('customer', 'industry', 'customer_id'),
+        'sales_rep': ('customer', 'account_manager', 'customer_id'),
+        'product': ('product', 'name', 'product_key'),
+        'region': ('region', 'name', 'region_key'),
+    },
+    'transactions': {
+        'customer': ('customer', 'company_name', 'customer_id'),
+        'industry': ('customer', 'industry', 'customer_id'),
+    },
+    'opportunities': {
+        'customer': ('customer', 'company_name', 'customer_id'),
+        'owner': ('customer', 'account_manager', 'customer_id'),
+    },
+}
+
+# filter field -> (dimension, attribute, key column) per fact table; hash-indexed on the gathered labels
+FILTER_DIMENSIONS = {
+    'sales': {'industry': ('customer', 'industry', 'customer_id'),
+              'region': ('region', 'name', 'region_key'),
+              'product': ('product', 'name', 'product_key')},
+    'transactions': {'industry': ('customer', 'industry', 'customer_id')},
+    'opportunities': {'industry': ('customer', 'industry', 'customer_id')},
+}
+
+
+def _key_dtype(size: int):
+    """Customer keys are the int32 surrogates; small label dimensions fit int8/int16 keys"""
+    return np.int8 if size < 2 ** 7 else np.int16 if size < 2 ** 15 else np.int32
+
+
+class Dimension:
+    """A dimension table: surrogate key = row position, every attribute a categorical code array over keys"""
+
+    def __init__(self, name: str, attributes: Dict[str, Sequence]):
+        self.name = name
+        self._lock = threading.Lock()
+        self._codes: Dict[str, np.ndarray] = {}
+        self._categories: Dict[str, pd.Index] = {}
+        for attribute, values in attributes.items():
+            categorical = pd.Categorical(values)
+            self._codes[attribute] = categorical.codes.astype(np.int32)
+            self._categories[attribute] = categorical.categories
+        self.size = len(next(iter(self._codes.values()))) if self._codes else 0
+
+    @classmethod
+    def from_keys(cls, name: str, keys: np.ndarray, attributes: Dict[str, Sequence]) -> "Dimension":
+        """Rows placed at their (surrogate) key; keys with no row get missing attributes"""
+        size = int(keys.max()) + 1 if len(keys) else 0
+        placed = {}
+        for attribute, values in attributes.items():
+            categorical = pd.Categorical(values)
+            codes = np.full(size, -1, dtype=np.int32)
+            codes[keys] = categorical.codes
+            placed[attribute] = pd.Categorical.from_codes(codes, categorical.categories)
+        return cls(name, placed)
+
+    def encode(self, labels: pd.Series) -> np.ndarray:
+        """Keys of a label dimension (key = position of its 'name'); unseen labels are added as new rows"""
+        categorical = labels.array if isinstance(labels.dtype, pd.CategoricalDtype) else pd.Categorical(labels)
+        observed = categorical.categories.astype(str)
+        with self._lock:
+            names = self._categories['name']
+            new = observed.difference(names)
+            if len(new):
+                # Categories before codes: a concurrent gather never sees a code without its label
+                self._categories['name'] = names = names.append(new)
+                self._codes['name'] = np.arange(len(names), dtype=np.int32)
+                self.size = len(names)
+            mapping = np.append(names.get_indexer(observed), -1)
+            return mapping[categorical.codes].astype(_key_dtype(self.size))
+
+    def gather_codes(self, attribute: str, keys: np.ndarray) -> np.ndarray:
+        """Attribute code per fact row; key -1 (unknown member) gives -1"""
+        return np.append(self._codes[attribute], -1)[keys]
+
+    def gather(self, attribute: str, keys: np.ndarray) -> pd.Categorical:
+        """Attribute value per fact row; key -1 (unknown member) gives a missing value"""
+        return pd.Categorical.from_codes(self.gather_codes(attribute, keys), self._categories[attribute], validate=False)
+
+    def codes_of(self, attribute: str, values: pd.Series) -> np.ndarray:
+        """Values as codes of this attribute: -1 for missing, -2 for labels the dimension does not have"""
+        categorical = values.array if isinstance(values.dtype, pd.CategoricalDtype) else pd.Categorical(values)
+        mapping = self._categories[attribute].get_indexer(categorical.categories)
+        mapping[mapping < 0] = -2
+        return np.append(mapping, -1)[categorical.codes]
+
+    def memory_bytes(self) -> int:
+        return int(sum(codes.nbytes for codes in self._codes.values()) +
+                   sum(categories.memory_usage(deep=True) for categories in self._categories.values()))
+
+
+class StarSchema:
+    """Customer, product and region dimensions; fact tables keep only keys for the attributes they determine"""
+
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        crm = frames['crm']
+        if not pd.api.types.is_integer_dtype(crm['customer_id']):
+            raise ValueError("The star schema needs integer customer surrogate keys (see SchemaLayer)")
+        self.dimensions = {
+            'customer': Dimension.from_keys('customer', crm['customer_id'].to_numpy(), {
+                'company_name': crm['company_name'], 'industry': crm['industry'],
+                'account_manager': crm['account_manager']}),
+            'product': Dimension('product', {'name': sorted(frames['sales']['product'].astype(str).unique())}),
+            'region': Dimension('region', {'name': sorted(frames['sales']['region'].astype(str).unique())}),
+        }
+        # fact table -> original column order, and the denormalized columns actually dropped
+        self.columns: Dict[str, list] = {}
+        self.dropped: Dict[str, list] = {}
+        self.report: Dict[str, Dict[str, Any]] = {}
+        for table in FACT_ATTRIBUTES:
+            if table in frames:
+                self._plan(table, frames[table])
+
+    def _plan(self, table: str, df: pd.DataFrame):
+        """Drop a column only when the key reproduces it on every row"""
+        self.columns[table] = list(df.columns)
+        keys = self._keys(table, df)
+        self.dropped[table] = [
+            column for column, (dimension, attribute, key) in FACT_ATTRIBUTES[table].items()
+            if column in df and self._reproduces(df[column], dimension, attribute, keys[key])
+        ]
+
+    def _keys(self, table: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        keys = {}
+        for column, (dimension, _, key) in FACT_ATTRIBUTES[table].items():
+            if key in keys or column not in df and key not in df:
+                continue
+            keys[key] = df[key].to_numpy() if key in df else self.dimensions[dimension].encode(df[column])
+        return keys
+
+    def _reproduces(self, values: pd.Series, dimension: str, attribute: str, keys: np.ndarray) -> bool:
+        """Compared as integer codes, never as strings"""
+        dim = self.dimensions[dimension]
+        return bool(np.array_equal(dim.gather_codes(attribute, keys), dim.codes_of(attribute, values)))
+
+    def split(self, table: str, df: pd.DataFrame) -> pd.DataFrame:
+        """The fact rows with dimension keys in place of the dropped attribute columns"""
+        if table not in self.dropped:
+            return df
+        keys = self._keys(table, df)
+        for column in self.dropped[table]:
+            dimension, attribute, key = FACT_ATTRIBUTES[table][column]
+            if not self._reproduces(df[column], dimension, attribute, keys[key]):
+                raise ValueError(f"'{column}' in {table} rows does not match the {dimension} dimension")
+        # Kept columns are not copied, so they go on sharing the compacted (or mapped) buffers
+        columns = {column: df[column] for column in df.columns if column not in self.dropped[table]}
+        for key, values in keys.items():
+            columns[key] = pd.Series(values, index=df.index)
+        return pd.DataFrame(columns, copy=False)
+
+    def join(self, table: str, fact: pd.DataFrame) -> pd.DataFrame:
+        """Gather the dropped attributes back by key, in the original column order"""
+        if table not in self.dropped:
+            return fact
+        columns = {}
+        for column in self.columns[table]:
+            if column in self.dropped[table]:
+                dimension, attribute, key = FACT_ATTRIBUTES[table][column]
+                columns[column] = pd.Series(self.dimensions[dimension].gather(attribute, fact[key].to_numpy()),
+                                            index=fact.index)
+            else:
+                columns[column] = fact[column]
+        return pd.DataFrame(columns, copy=False)
+
+    def filter_labels(self, table: str, fact: pd.DataFrame) -> Dict[str, pd.Categorical]:
+        """Filter field -> attribute value per normalized fact row, for building the hash indexes"""
+        return {field: self.dimensions[dimension].gather(attribute, fact[key].to_numpy())
+                for field, (dimension, attribute, key) in FILTER_DIMENSIONS.get(table, {}).items()}
+
+    def record(self, table: str, before: pd.DataFrame, after: pd.DataFrame):
+        before_bytes = int(before.memory_usage(deep=True, index=False).sum())
+        after_bytes = int(after.memory_usage(deep=True, index=False).sum())
+        self.report[table] = {'bytes_before': before_bytes, 'bytes_after': after_bytes,
+                              'reduction': round(before_bytes / after_bytes, 2) if after_bytes else None,
+                              'dropped': self.dropped[table]}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'dimensions': {name: {'rows': d.size, 'bytes': d.memory_bytes()} for name, d in self.dimensions.items()},
+                'facts': self.report}
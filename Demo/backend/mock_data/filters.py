@@ -0,0 +1,152 @@
+import copy
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Optional, Sequence, Tuple
+from .data_generator import (INDUSTRIES, PRODUCTS, REGIONS, SALES_STATUSES,
+                             TRANSACTION_TYPES, TRANSACTION_STATUSES)
+from .indexes import TableIndex, _intersect_sorted
+
+# Canonical spelling for each categorical filter, looked up case-insensitively
+VOCABULARIES = {
+    'industry': INDUSTRIES,
+    'region': REGIONS,
+    'product': PRODUCTS,
+    'transaction_type': TRANSACTION_TYPES,
+    'status': list(dict.fromkeys(SALES_STATUSES + TRANSACTION_STATUSES)),
+}
+DATE_FIELDS = ('date_from', 'date_to')
+NUMERIC_FIELDS = ('min_amount',)
+FILTER_FIELDS = DATE_FIELDS + NUMERIC_FIELDS + tuple(VOCABULARIES)
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Return (clean filters, rejected field -> reason); None values are dropped silently"""
+    clean, rejected = {}, {}
+    for field, value in (filters or {}).items():
+        if value is None or value == '':
+            continue
+        if field not in FILTER_FIELDS:
+            rejected[field] = 'unknown filter'
+        elif field in DATE_FIELDS:
+            try:
+                clean[field] = pd.Timestamp(value).normalize()
+            except (ValueError, TypeError):
+                rejected[field] = f'invalid date {value!r}'
+        elif field in NUMERIC_FIELDS:
+            try:
+                clean[field] = float(value)
+            except (ValueError, TypeError):
+                rejected[field] = f'invalid number {value!r}'
+        else:
+            text = str(value).strip()
+            canonical = {v.lower(): v for v in VOCABULARIES[field]}
+            # Unknown values are kept: they legitimately match no rows
+            clean[field] = canonical.get(text.lower(), text)
+
+    if 'date_from' in clean and 'date_to' in clean and clean['date_from'] > clean['date_to']:
+        rejected['date_to'] = 'date_to is before date_from'
+        del clean['date_from'], clean['date_to']
+    return clean, rejected
+
+
+class SourceFilter:
+    """Applies normalized filters to one source: index lookups first, then one vectorized mask"""
+
+    def __init__(self, num_rows: int, index: Optional[TableIndex] = None, columns: Optional[Dict[str, Sequence]] = None):
+        self.num_rows = num_rows
+        self.index = index
+        # field -> values compared by the mask (date_from/date_to/min_amount use >=/<=, the rest equality)
+        self._columns = {field: self._prepare(field, values, {}) for field, values in (columns or {}).items()}
+
+    @staticmethod
+    def _prepare(field: str, values: Sequence, lookup: Dict[str, int]):
+        if field in VOCABULARIES:
+            # Codes continue from `lookup`, so appended rows share the existing code space
+            keys, uniques = pd.factorize(pd.Series(np.asarray(values, dtype=object)).astype(str).str.lower())
+            lookup = dict(lookup)
+            mapping = np.array([lookup.setdefault(value, len(lookup)) for value in uniques], dtype=np.intp)
+            return mapping[keys] if len(keys) else np.empty(0, dtype=np.intp), lookup
+        if field in DATE_FIELDS:
+            return np.asarray(values, dtype='datetime64[ns]')
+        return np.asarray(values, dtype=np.float64)
+
+    def append(self, num_rows: int, index: Optional[TableIndex] = None, columns: Optional[Dict[str, Sequence]] = None) -> "SourceFilter":
+        """A new filter over the existing rows plus `num_rows` appended ones; self is left untouched"""
+        extended = copy.copy(self)
+        extended.num_rows = self.num_rows + num_rows
+        extended.index = index
+        extended._columns = {}
+        for field, existing in self._columns.items():
+            if field in VOCABULARIES:
+                codes, lookup = self._prepare(field, columns[field], existing[1])
+                extended._columns[field] = (np.concatenate([existing[0], codes]), lookup)
+            else:
+                extended._columns[field] = np.concatenate([existing, self._prepare(field, columns[field], {})])
+        return extended
+
+    def _indexed(self, field: str) -> bool:
+        if self.index is None:
+            return False
+        if field in DATE_FIELDS:
+            return self.index.date_column is not None
+        return field in self.index.indexed_columns()
+
+    def supported_fields(self):
+        return {f for f in FILTER_FIELDS if self._indexed(f) or f in self._columns}
+
+    def _predicate(self, field: str, value, positions: Optional[np.ndarray]) -> np.ndarray:
+        column = self._columns[field]
+        if field in VOCABULARIES:
+            codes, lookup = column
+            values = codes if positions is None else codes[positions]
+            return values == lookup.get(str(value).lower(), -1)
+        values = column if positions is None else column[positions]
+        if field == 'date_to':
+            return values <= np.datetime64(value, 'ns')
+        if field == 'date_from':
+            return values >= np.datetime64(value, 'ns')
+        return values >= value
+
+    def select(self, filters: Dict[str, Any], stats: Optional[Dict[str, Any]] = None) -> Optional[np.ndarray]:
+        """Row positions matching every supported filter, or None when nothing is filtered"""
+        applied, candidates = {}, []
+
+        if self._indexed('date_from') and ('date_from' in filters or 'date_to' in filters):
+            rows = self.index.date_range(filters.get('date_from'), filters.get('date_to'))
+            candidates.append(rows)
+            applied['date'] = {'via': 'index', 'rows': len(rows)}
+        for field in FILTER_FIELDS:
+            if field in filters and field not in DATE_FIELDS and self._indexed(field):
+                rows = self.index.lookup(field, filters[field])
+                candidates.append(rows)
+                applied[field] = {'via': 'index', 'rows': len(rows)}
+
+        # Intersect smallest first so the work tracks the result size
+        candidates.sort(key=len)
+        positions = candidates[0] if candidates else None
+        for other in candidates[1:]:
+            if len(positions) == 0:
+                break
+            positions = _intersect_sorted(positions, other)
+
+        scanned = [f for f in FILTER_FIELDS if f in filters and f in self._columns and f not in applied
+                   and not (f in DATE_FIELDS and 'date' in applied)]
+        if scanned and (positions is None or len(positions)):
+            rows_in = self.num_rows if positions is None else len(positions)
+            mask = np.ones(rows_in, dtype=bool)
+            for field in scanned:
+                matched = self._predicate(field, filters[field], positions)
+                applied[field] = {'via': 'mask', 'rows': int(matched.sum()), 'of': rows_in}
+                mask &= matched
+            positions = np.flatnonzero(mask) if positions is None else positions[mask]
+
+        if stats is not None:
+            for entry in applied.values():
+                entry['selectivity'] = round(entry['rows'] / entry.get('of', self.num_rows), 4) if self.num_rows else 0.0
+            stats.update({
+                'rows_scanned': self.num_rows,
+                'rows_returned': self.num_rows if positions is None else len(positions),
+                'applied': applied,
+                'not_applicable': sorted(set(filters) - self.supported_fields())
+            })
+        return positions
@@ -0,0 +1,79 @@
+import copy
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Optional, Sequence
+
+
+class TableIndex:
+    """Positional indexes over one cached frame: a sorted date index plus hash indexes"""
+
+    def __init__(self, df: pd.DataFrame, date_column: Optional[str] = None, hash_columns: Optional[Dict[str, Sequence]] = None):
+        self.num_rows = len(df)
+        self.date_column = date_column
+
+        if date_column is not None:
+            values = df[date_column].to_numpy(dtype='datetime64[ns]')
+            self._date_order = np.argsort(values, kind='stable')
+            self._date_sorted = values[self._date_order]
+
+        # value (lower-cased) -> ascending row positions
+        self._hash: Dict[str, Dict[Any, np.ndarray]] = {
+            column: _hash_positions(values) for column, values in (hash_columns or {}).items()
+        }
+
+    def append(self, batch: pd.DataFrame, hash_columns: Optional[Dict[str, Sequence]] = None) -> "TableIndex":
+        """A new index covering the existing rows plus `batch` (appended after them); self is left untouched"""
+        index = copy.copy(self)
+        offset, index.num_rows = self.num_rows, self.num_rows + len(batch)
+
+        if self.date_column is not None:
+            # Merge the sorted batch dates into the sorted index instead of re-sorting everything
+            values = batch[self.date_column].to_numpy(dtype='datetime64[ns]')
+            order = np.argsort(values, kind='stable')
+            at = np.searchsorted(self._date_sorted, values[order], side='right')
+            index._date_sorted = np.insert(self._date_sorted, at, values[order])
+            index._date_order = np.insert(self._date_order, at, order + offset)
+
+        # New positions are larger than every existing one, so the position lists stay ascending
+        index._hash = {}
+        for column, positions in self._hash.items():
+            merged = dict(positions)
+            for value, new in _hash_positions((hash_columns or {})[column]).items():
+                merged[value] = np.concatenate([positions[value], new + offset]) if value in positions else new + offset
+            index._hash[column] = merged
+        return index
+
+    def indexed_columns(self):
+        return list(self._hash)
+
+    def date_range(self, date_from=None, date_to=None) -> np.ndarray:
+        """Positions with date_from <= date <= date_to via binary search"""
+        lo = 0 if date_from is None else np.searchsorted(self._date_sorted, np.datetime64(pd.to_datetime(date_from), 'ns'), side='left')
+        hi = len(self._date_sorted) if date_to is None else np.searchsorted(self._date_sorted, np.datetime64(pd.to_datetime(date_to), 'ns'), side='right')
+        return np.sort(self._date_order[lo:hi])
+
+    def lookup(self, column: str, value) -> np.ndarray:
+        return self._hash[column].get(str(value).lower(), np.empty(0, dtype=np.intp))
+
+
+def _hash_positions(values: Sequence) -> Dict[Any, np.ndarray]:
+    codes, uniques = pd.factorize(pd.Series(np.asarray(values, dtype=object)).astype(str).str.lower())
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)}
+
+
+def _intersect_sorted(small: np.ndarray, large: np.ndarray) -> np.ndarray:
+    """Intersection of two ascending position arrays in O(len(small) * log(len(large)))"""
+    if len(large) == 0:
+        return large
+    idx = np.searchsorted(large, small)
+    idx[idx == len(large)] = len(large) - 1
+    return small[large[idx] == small]
+
+
+def materialize(df: pd.DataFrame, positions: Optional[np.ndarray]) -> pd.DataFrame:
+    """Only the selected rows are copied; unfiltered reads share the cached data"""
+    if positions is None:
+        return df.copy(deep=False)
+    return df.take(positions)
@@ -1,76 +1,147 @@
 import pandas as pd
 import random
+import threading
 from datetime import datetime, timedelta
 from .data_generator import DataGenerator
+from .filters import normalize_filters
+from .connectors import SourceConnector, InMemoryConnector, customer_industry_map
+from .running_stats import TableSummary
 
-class MockERPSystem:
-    def __init__(self, crm_df: pd.DataFrame):
+# table -> (measures with running stats, columns with running value counts)
+SUMMARY_COLUMNS = {'sales': (['total', 'quantity'], ['status', 'region', 'product']),
+                   'transactions': (['amount'], ['status', 'type'])}
+
+
+class AppendableSource:
+    """Batch appends with running summaries; a batch is applied everywhere or nowhere"""
+
+    def _init_appends(self):
+        self._append_lock = threading.Lock()
+        self._listeners = []
+        # table -> TableSummary, built on first use and merged with every batch after that
+        self._summaries = {}
+
+    def on_append(self, listener):
+        """listener(table, batch) runs under the append lock before the connector has the rows; it builds
+        its update aside and returns a callable that swaps it in once the rows are committed"""
+        self._listeners.append(listener)
+
+    def _append(self, table: str, batch: pd.DataFrame) -> int:
+        with self._append_lock:
+            # Everything that can fail runs first; the connector append is the commit point
+            summary = self._summaries[table].merge(TableSummary.of(batch, *SUMMARY_COLUMNS[table])) \
+                if table in self._summaries else None
+            swaps = [listener(table, batch) for listener in self._listeners]
+            self.connector.append(table, batch)
+            if summary is not None:
+                self._summaries[table] = summary
+            for swap in swaps:
+                swap()
+            self.data_version += 1
+            return self.data_version
+
+    def _summary(self, table: str) -> TableSummary:
+        with self._append_lock:
+            if table not in self._summaries:
+                self._summaries[table] = TableSummary.of(self.connector.read(table, {}), *SUMMARY_COLUMNS[table])
+            return self._summaries[table]
+
+
+class MockERPSystem(AppendableSource):
+    def __init__(self, crm_df: pd.DataFrame, sales_df: pd.DataFrame = None,
+                 financial_df: pd.DataFrame = None, inventory_df: pd.DataFrame = None,
+                 connector: SourceConnector = None):
         self.generator = DataGenerator()
         self.crm_df = crm_df
-        self._cache = {}
-
-    def get_sales_transactions(self, filters=None):
-        if 'sales' not in self._cache:
-            self._cache['sales'] = self.generator.generate_sales_data(self.crm_df,num_records=200)
-            
-            self._cache['sales']['customer_id'] = random.choices(self.crm_df['customer_id'], k=len(self._cache['sales']))
-        df = self._cache['sales'].copy()
-        if filters:
-            if 'industry' in filters:
-                df = df[df['customer_id'].isin(
-                    self.crm_df[self.crm_df['industry'].str.lower() == filters['industry'].lower()]['customer_id']
-                )]
-            if 'date_from' in filters:
-                df = df[df['date'] >= pd.to_datetime(filters['date_from'])]
-            if 'date_to' in filters:
-                df = df[df['date'] <= pd.to_datetime(filters['date_to'])]
-        return df
-
-    def get_financial_records(self, filters=None):
-        if 'financial' not in self._cache:
-            self._cache['financial'] = self.generator.generate_financial_data(num_records=12)
-        return self._cache['financial'].copy()
-
-    def get_inventory_data(self, filters=None):
-        if 'inventory' not in self._cache:
-            self._cache['inventory'] = self.generator.generate_inventory_data(num_records=50)
-        return self._cache['inventory'].copy()
+        self.customer_industry = customer_industry_map(crm_df)
+
+        if connector is None:
+            # Standalone use: generate whatever was not supplied and serve it from memory
+            if sales_df is None:
+                sales_df = self.generator.generate_sales_data(self.crm_df,num_records=200)
+
+                sales_df['customer_id'] = random.choices(self.crm_df['customer_id'], k=len(sales_df))
+            if financial_df is None:
+                financial_df = self.generator.generate_financial_data(num_records=12)
+            if inventory_df is None:
+                inventory_df = self.generator.generate_inventory_data(num_records=50)
+            connector = InMemoryConnector({'customers': crm_df, 'sales': sales_df,
+                                           'financial': financial_df, 'inventory': inventory_df})
+        self.connector = connector
+        # Bumped whenever this system's data changes; cached stage results keyed on it go stale
+        self.data_version = 0
+        self._init_appends()
+
+    def get_sales_transactions(self, filters=None, stats=None):
+        return self.connector.read('sales', normalize_filters(filters)[0], stats)
+
+    def get_financial_records(self, filters=None, stats=None):
+        return self.connector.read('financial', normalize_filters(filters)[0], stats)
+
+    def get_inventory_data(self, filters=None, stats=None):
+        return self.connector.read('inventory', normalize_filters(filters)[0], stats)
+
+    def aggregate_sales(self, measures, group_by=(), filters=None):
+        """e.g. measures={'revenue': ('sum', 'total'), 'orders': ('count', '*')}, group_by=['region']"""
+        return self.connector.aggregate('sales', measures, group_by, normalize_filters(filters)[0])
+
+    def append_sales(self, batch: pd.DataFrame) -> int:
+        """Add a batch of sales rows (same columns as the table); returns the new data version"""
+        return self._append('sales', batch)
+
+    def sales_summary(self) -> TableSummary:
+        """Row count, running sum/mean/variance/max of total and quantity, and status/region/product counts"""
+        return self._summary('sales')
 
 
 class MockCRMSystem:
-    def __init__(self, crm_df: pd.DataFrame):
+    def __init__(self, crm_df: pd.DataFrame, opportunities_df: pd.DataFrame = None,
+                 connector: SourceConnector = None):
         self.generator = DataGenerator()
         self.crm_df = crm_df
-        self._cache = {'customers': crm_df.copy(), 'opportunities': self.generator.generate_opportunities(self.crm_df,80)}
-
-    def get_customer_data(self, filters=None):
-        df = self._cache['customers'].copy()
-        if filters:
-            if 'industry' in filters:
-                df = df[df['industry'].str.lower() == filters['industry'].lower()]
-        return df
-
-    def get_opportunities(self, filters=None):
-        df = self._cache['opportunities'].copy()
-        if filters:
-            if 'industry' in filters:
-                df = df[df['customer'].isin(
-                    self.crm_df[self.crm_df['industry'].str.lower() == filters['industry'].lower()]['company_name']
-                )]
-        return df
-
-
-class MockBusinessTransactions:
-    def __init__(self, crm_df: pd.DataFrame):
+        self.customer_industry = customer_industry_map(crm_df)
+        if connector is None:
+            if opportunities_df is None:
+                opportunities_df = self.generator.generate_opportunities(self.crm_df,80)
+            connector = InMemoryConnector({'customers': crm_df.copy(), 'opportunities': opportunities_df})
+        self.connector = connector
+        # Bumped whenever this system's data changes; cached stage results keyed on it go stale
+        self.data_version = 0
+
+    def get_customer_data(self, filters=None, stats=None):
+        return self.connector.read('customers', normalize_filters(filters)[0], stats)
+
+    def get_opportunities(self, filters=None, stats=None):
+        return self.connector.read('opportunities', normalize_filters(filters)[0], stats)
+
+    def aggregate_customers(self, measures, group_by=(), filters=None):
+        return self.connector.aggregate('customers', measures, group_by, normalize_filters(filters)[0])
+
+
+class MockBusinessTransactions(AppendableSource):
+    def __init__(self, crm_df: pd.DataFrame, transactions_df: pd.DataFrame = None,
+                 connector: SourceConnector = None):
         self.generator = DataGenerator()
         self.crm_df = crm_df
-        self._cache = {'transactions': self.generator.generate_business_transactions(self.crm_df,150)}
-
-    def get_transactions(self, filters=None):
-        df = self._cache['transactions'].copy()
-        if filters:
-            if 'industry' in filters:
-                df = df[df['customer_id'].isin(
-                    self.crm_df[self.crm_df['industry'].str.lower() == filters['industry'].lower()]['customer_id']
-                )]
-        return df
+        self.customer_industry = customer_industry_map(crm_df)
+        if connector is None:
+            if transactions_df is None:
+                transactions_df = self.generator.generate_business_transactions(self.crm_df,150)
+            connector = InMemoryConnector({'customers': crm_df, 'transactions': transactions_df})
+        self.connector = connector
+        # Bumped whenever this system's data changes; cached stage results keyed on it go stale
+        self.data_version = 0
+        self._init_appends()
+
+    def get_transactions(self, filters=None, stats=None):
+        return self.connector.read('transactions', normalize_filters(filters)[0], stats)
+
+    def aggregate_transactions(self, measures, group_by=(), filters=None):
+        return self.connector.aggregate('transactions', measures, group_by, normalize_filters(filters)[0])
+
+    def append_transactions(self, batch: pd.DataFrame) -> int:
+        """Add a batch of business transactions; returns the new data version"""
+        return self._append('transactions', batch)
+
+    def transactions_summary(self) -> TableSummary:
+        return self._summary('transactions')
@@ -0,0 +1,166 @@
+"""Deterministic OpenAI-compatible stand-in for the report LLM.
+
+Run from the backend directory and point the agents at it:
+
+    python -m mock_data.mock_llm_server --port 8001 --latency lognormal:800:0.4 --tokens-per-second 60
+    LLM_BASE_URL=http://127.0.0.1:8001/v1 uvicorn api.main:app
+"""
+import re
+import json
+import time
+import random
+import asyncio
+import argparse
+from typing import Dict, Any, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+REPORT_TEMPLATE = """# {focus}
+
+## Executive Summary
+Performance for the requested period is stable, with revenue concentrated in the leading products and regions.
+
+## Key Findings
+- Revenue and transaction volumes are in line with the trailing average.
+- The top product and region account for the largest share of sales.
+
+## Detailed Analysis
+The aggregated figures show consistent order sizes across regions, with no single customer dominating volume.
+
+## Anomalies & Alerts
+Review any high-value transactions flagged above the three-sigma threshold.
+
+## Recommendations
+1. Prioritise follow-up on pending transactions.
+2. Expand campaigns in the strongest region.
+
+## Future Outlook
+Current trends suggest steady performance next quarter.
+"""
+
+
+class LatencyModel:
+    """Samples response latency (ms) from a fixed, uniform, normal or lognormal distribution"""
+
+    def __init__(self, spec: str = "fixed:0", seed: int = 42):
+        parts = spec.split(":")
+        self.kind = parts[0]
+        self.params = [float(p) for p in parts[1:]]
+        self.rng = random.Random(seed)
+
+    def sample_ms(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0] if self.params else 0.0
+        if self.kind == "uniform":
+            low, high = self.params
+            return self.rng.uniform(low, high)
+        if self.kind == "normal":
+            mean, std = self.params
+            return max(0.0, self.rng.gauss(mean, std))
+        if self.kind == "lognormal":
+            # median ms and sigma of the underlying normal
+            median, sigma = self.params
+            return median * self.rng.lognormvariate(0, sigma)
+        raise ValueError(f"Unknown latency distribution: {self.kind}")
+
+
+def mock_completion(prompt: str) -> str:
+    """Schema-valid answer for each agent prompt"""
+    from agents.rule_parser import RuleBasedQueryParser
+
+    if prompt.startswith("Parse this user query"):
+        match = re.search(r'User Query: "(.*)"', prompt)
+        parsed, _ = RuleBasedQueryParser().parse(match.group(1) if match else "", {})
+        for key in ('requestor', 'department', 'user_role'):
+            parsed.pop(key, None)
+        return json.dumps(parsed)
+
+    if "approval workflow" in prompt:
+        match = re.search(r'Baseline workflow from these rules[^\n]*\n(.*?)\n\nReturn ONLY', prompt, re.S)
+        if match:
+            return match.group(1)
+        return json.dumps({
+            "name": "Standard Approval Workflow",
+            "stages": [{"id": "stage_1", "name": "Manager Review", "approvers": ["Manager"],
+                        "type": "sequential", "requires": "single", "timeout_hours": 24}],
+            "notifications": {"on_submit": True, "on_approval": True, "on_rejection": True},
+            "reason": "Mock workflow"
+        })
+
+    match = re.search(r'Report Focus: (.*)', prompt)
+    return REPORT_TEMPLATE.format(focus=match.group(1).strip() if match else "Business Report")
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r'\S+\s*|\s+', text)
+
+
+def create_app(latency: str = "fixed:0", tokens_per_second: float = 0, seed: int = 42) -> FastAPI:
+    app = FastAPI(title="Mock LLM")
+    latency_model = LatencyModel(latency, seed)
+    app.state.requests = 0
+
+    @app.post("/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        messages: List[Dict[str, Any]] = body.get("messages", [])
+        prompt = messages[-1].get("content", "") if messages else ""
+        content = mock_completion(prompt)
+        tokens = _tokens(content)
+        model = body.get("model", "mock")
+        created = int(time.time())
+        completion_id = f"chatcmpl-mock-{app.state.requests}"
+        delay_per_token = 1 / tokens_per_second if tokens_per_second > 0 else 0
+
+        await asyncio.sleep(latency_model.sample_ms() / 1000)
+
+        if body.get("stream"):
+            async def stream():
+                for token in tokens:
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {"role": "assistant", "content": token}, "finish_reason": None}]
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    if delay_per_token:
+                        await asyncio.sleep(delay_per_token)
+                final = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(stream(), media_type="text/event-stream")
+
+        await asyncio.sleep(delay_per_token * len(tokens))
+        prompt_tokens = len(_tokens(prompt))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                      "total_tokens": prompt_tokens + len(tokens)}
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the mock OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", default="fixed:0",
+                        help="fixed:MS | uniform:LOW:HIGH | normal:MEAN:STD | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="0 streams as fast as possible")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.latency, args.tokens_per_second, args.seed), host=args.host, port=args.port)
@@ -0,0 +1,159 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Optional, Callable, List, Tuple
+from pandas.api.types import union_categoricals
+
+from .filters import SourceFilter, DATE_FIELDS
+from .indexes import materialize
+
+# DATA_PARTITION_FREQ value -> pandas period frequency
+PARTITION_FREQS = {'month': 'M', 'quarter': 'Q', 'year': 'Y'}
+
+# A partition's rows plus the filter built over them
+Segment = Tuple[pd.DataFrame, SourceFilter]
+
+
+def partition_freq_from_env() -> Optional[str]:
+    """DATA_PARTITION_FREQ=month (default), quarter, year or none"""
+    value = os.getenv("DATA_PARTITION_FREQ", "month").lower()
+    if value == "none":
+        return None
+    if value not in PARTITION_FREQS:
+        raise ValueError(f"DATA_PARTITION_FREQ must be one of {sorted(PARTITION_FREQS)} or none")
+    return PARTITION_FREQS[value]
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Row-wise concat; categorical columns stay categorical even when their categories differ"""
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    columns = {}
+    for column in frames[0].columns:
+        parts = [df[column].reset_index(drop=True) for df in frames]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            dtype = parts[0].cat.categories.dtype
+            parts = [p if isinstance(p.dtype, pd.CategoricalDtype) else p.astype(dtype).astype('category') for p in parts]
+            columns[column] = pd.Series(union_categoricals(parts), name=column)
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+class Partition:
+    """Rows of one period with the period bounds and the actual min/max date"""
+
+    def __init__(self, key: str, period: pd.Period, segment: Segment, date_column: str):
+        self.key = key
+        self.start = period.start_time
+        self.end = period.end_time
+        self.segment = segment
+        dates = segment[0][date_column]
+        self.min_date = dates.min()
+        self.max_date = dates.max()
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.segment[0])
+
+
+class PartitionedTable:
+    """A fact table stored as one segment per period; date filters pick partitions before any row is touched"""
+
+    def __init__(self, partitions: List[Partition], date_column: str, freq: str):
+        self.partitions = sorted(partitions, key=lambda p: p.start)
+        self.date_column = date_column
+        self.freq = freq
+
+    @classmethod
+    def split(cls, df: pd.DataFrame, date_column: str, freq: str, build: Callable[[pd.DataFrame], Segment]) -> "PartitionedTable":
+        """Partitions are row slices of `df`, sharing its buffers; rows not already in date order are
+        reordered once (a copy) first"""
+        dates = df[date_column]
+        if not dates.is_monotonic_increasing:
+            df = df.take(np.argsort(dates.to_numpy(), kind='stable')).reset_index(drop=True)
+            dates = df[date_column]
+        periods = dates.dt.to_period(freq)
+        bounds = np.flatnonzero(np.diff(periods.array.asi8)) + 1
+        starts, stops = np.r_[0, bounds], np.r_[bounds, len(df)]
+        partitions = [
+            Partition(str(periods.iloc[start]), periods.iloc[start],
+                      build(df.iloc[start:stop].reset_index(drop=True)), date_column)
+            for start, stop in zip(starts, stops) if stop > start
+        ]
+        return cls(partitions, date_column, freq)
+
+    @property
+    def num_rows(self) -> int:
+        return sum(p.num_rows for p in self.partitions)
+
+    def prune(self, filters: Dict[str, Any]) -> Tuple[List[Partition], List[Partition]]:
+        """(partitions overlapping the date window, those of them lying entirely inside it) from min/max only"""
+        date_from, date_to = filters.get('date_from'), filters.get('date_to')
+        overlapping, covered = [], []
+        for partition in self.partitions:
+            if (date_from is not None and partition.max_date < date_from) or \
+                    (date_to is not None and partition.min_date > date_to):
+                continue
+            overlapping.append(partition)
+            if (date_from is None or partition.min_date >= date_from) and \
+                    (date_to is None or partition.max_date <= date_to):
+                covered.append(partition)
+        return overlapping, covered
+
+    def read(self, filters: Dict[str, Any], stats: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        overlapping, covered = self.prune(filters)
+        covered_keys = {p.key for p in covered}
+        row_filters = {k: v for k, v in filters.items() if k not in DATE_FIELDS}
+        frames, applied, rows_scanned, not_applicable = [], {}, 0, []
+        for partition in overlapping:
+            df, source_filter = partition.segment
+            part_stats = {}
+            # Inside the window the date predicate is already known to hold
+            positions = source_filter.select(row_filters if partition.key in covered_keys else filters, part_stats)
+            frames.append(materialize(df, positions))
+            rows_scanned += partition.num_rows
+            for field, entry in part_stats['applied'].items():
+                merged = applied.setdefault(field, {'via': entry['via'], 'rows': 0, 'of': 0})
+                merged['rows'] += entry['rows']
+                merged['of'] += entry.get('of', partition.num_rows)
+            not_applicable = part_stats['not_applicable']
+
+        if frames:
+            result = concat_frames(frames)
+        else:
+            result = self.partitions[0].segment[0].iloc[:0] if self.partitions else pd.DataFrame()
+        if stats is not None:
+            if any(f in filters for f in DATE_FIELDS):
+                matched = sum(p.num_rows for p in covered) + applied.pop('date', {}).get('rows', 0)
+                applied['date'] = {'via': 'partitions', 'rows': matched, 'of': self.num_rows}
+            for entry in applied.values():
+                entry['selectivity'] = round(entry['rows'] / entry['of'], 4) if entry['of'] else 0.0
+            stats.update({
+                'rows_scanned': rows_scanned,
+                'rows_returned': len(result),
+                'applied': applied,
+                'not_applicable': not_applicable,
+                'partitions': {
+                    'freq': self.freq,
+                    'total': len(self.partitions),
+                    'scanned': len(overlapping),
+                    'pruned': len(self.partitions) - len(overlapping),
+                    'fully_covered': len(covered),
+                    'rows_total': self.num_rows,
+                    'rows_pruned': self.num_rows - rows_scanned
+                }
+            })
+        return result
+
+    def append(self, batch: pd.DataFrame, build: Callable[[pd.DataFrame], Segment],
+               extend: Callable[[Segment, pd.DataFrame], Segment]) -> "PartitionedTable":
+        """A new table with `batch` routed to its periods; only the partitions it touches are copied"""
+        by_key = {p.key: p for p in self.partitions}
+        groups = batch.groupby(batch[self.date_column].dt.to_period(self.freq), sort=True).indices
+        for period, positions in groups.items():
+            rows = batch.take(positions).reset_index(drop=True)
+            key = str(period)
+            segment = extend(by_key[key].segment, rows) if key in by_key else build(rows)
+            by_key[key] = Partition(key, period, segment, self.date_column)
+        return PartitionedTable(list(by_key.values()), self.date_column, self.freq)
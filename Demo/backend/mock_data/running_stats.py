@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Sequence
+
+
+class RunningStats:
+    """Count, sum, max and Welford mean/variance of one measure, merged batch by batch (Chan et al.)"""
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0, total: float = 0.0, maximum: float = np.nan):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.total = total
+        self.maximum = maximum
+
+    @classmethod
+    def of(cls, values) -> "RunningStats":
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return cls()
+        mean = float(values.mean())
+        return cls(len(values), mean, float(((values - mean) ** 2).sum()), float(values.sum()), float(values.max()))
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Stats over both sets of values; neither operand changes"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return other
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        return RunningStats(count,
+                            self.mean + delta * other.count / count,
+                            self.m2 + other.m2 + delta * delta * self.count * other.count / count,
+                            self.total + other.total,
+                            float(np.fmax(self.maximum, other.maximum)))
+
+    @property
+    def variance(self) -> float:
+        """Sample variance, matching pandas' std()"""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'sum': self.total, 'mean': self.mean if self.count else None,
+                'std': self.std if self.count > 1 else None, 'max': self.maximum if self.count else None}
+
+
+class TableSummary:
+    """Row count, RunningStats per measure and value counts per column for one table"""
+
+    def __init__(self, rows: int, measures: Dict[str, RunningStats], counts: Dict[str, Dict[str, int]]):
+        self.rows = rows
+        self.measures = measures
+        self.counts = counts
+
+    @classmethod
+    def of(cls, df: pd.DataFrame, measures: Sequence[str], count_by: Sequence[str] = ()) -> "TableSummary":
+        return cls(len(df),
+                   {measure: RunningStats.of(df[measure].to_numpy(dtype=np.float64)) for measure in measures},
+                   {column: {str(k): int(n) for k, n in df[column].value_counts(sort=False).items() if n}
+                    for column in count_by})
+
+    def merge(self, other: "TableSummary") -> "TableSummary":
+        counts = {}
+        for column, values in self.counts.items():
+            counts[column] = dict(values)
+            for value, n in other.counts.get(column, {}).items():
+                counts[column][value] = counts[column].get(value, 0) + n
+        return TableSummary(self.rows + other.rows,
+                            {m: stats.merge(other.measures[m]) for m, stats in self.measures.items()},
+                            counts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'rows': self.rows, 'measures': {m: s.to_dict() for m, s in self.measures.items()}, 'counts': self.counts}
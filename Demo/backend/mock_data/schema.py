@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any
+
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:  # without pyarrow high-cardinality text stays in pandas' default string dtype
+    STRING_DTYPE = 'string'
+
+# UUID columns replaced by int32 surrogate keys: frame -> column -> key namespace
+KEY_COLUMNS = {
+    'crm': {'customer_id': 'customer'},
+    'sales': {'transaction_id': 'sale', 'customer_id': 'customer'},
+    'inventory': {'product_id': 'product'},
+    'opportunities': {'opportunity_id': 'opportunity', 'customer_id': 'customer'},
+    'transactions': {'transaction_id': 'transaction', 'customer_id': 'customer'},
+}
+
+# Text columns with at most this share of distinct values are dictionary-encoded
+CATEGORY_RATIO = 0.5
+
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+class SchemaLayer:
+    """Categorical and Arrow-backed dtypes, downcast numerics and int32 surrogate keys for the generated frames"""
+
+    def __init__(self):
+        # namespace -> original ids; a surrogate key is a position in this array
+        self.keys: Dict[str, np.ndarray] = {}
+        # namespace -> frame whose column defines it (the others hold foreign keys)
+        self.owners: Dict[str, str] = {}
+        self.report: Dict[str, Dict[str, Any]] = {}
+
+    def apply(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        # CRM first, so every foreign customer_id resolves against its keys
+        order = sorted(frames, key=lambda name: name != 'crm')
+        compacted = {}
+        for name in order:
+            df = frames[name]
+            before = memory_bytes(df)
+            # Columns _compact leaves as they are stay views (of the snapshot's mapped pages, when loaded)
+            compacted[name] = pd.DataFrame({
+                column: self._compact(name, column, df[column]) for column in df.columns
+            }, copy=False)
+            after = memory_bytes(compacted[name])
+            self.report[name] = {
+                'rows': len(df),
+                'bytes_before': before,
+                'bytes_after': after,
+                'reduction': round(before / after, 2) if after else None,
+                'dtypes': {column: str(dtype) for column, dtype in compacted[name].dtypes.items()}
+            }
+        return {name: compacted[name] for name in frames}
+
+    def _compact(self, frame: str, column: str, values: pd.Series) -> pd.Series:
+        namespace = KEY_COLUMNS.get(frame, {}).get(column)
+        if namespace is not None:
+            self.owners.setdefault(namespace, frame)
+            return self._surrogate(namespace, values)
+        if pd.api.types.is_integer_dtype(values):
+            return pd.to_numeric(values, downcast='integer')
+        if pd.api.types.is_float_dtype(values):
+            # Only when lossless: money amounts with cents stay float64
+            narrow = values.astype(np.float32)
+            return narrow if np.array_equal(narrow.to_numpy(dtype=np.float64), values.to_numpy(), equal_nan=True) else values
+        if pd.api.types.is_string_dtype(values) or values.dtype == object:
+            if values.nunique(dropna=True) <= max(1, CATEGORY_RATIO * len(values)):
+                return values.astype('category')
+            return values.astype(STRING_DTYPE)
+        return values
+
+    def _surrogate(self, namespace: str, values: pd.Series) -> pd.Series:
+        if namespace not in self.keys:
+            codes, uniques = pd.factorize(values)
+            self.keys[namespace] = np.asarray(uniques, dtype=object)
+        else:
+            # Foreign keys; ids missing from the dimension become -1
+            codes = pd.Index(self.keys[namespace]).get_indexer(values)
+        return pd.Series(codes.astype(np.int32), index=values.index, name=values.name)
+
+    def conform(self, frame: str, batch: pd.DataFrame) -> pd.DataFrame:
+        """Bring a batch of new rows for an already compacted frame into its keys and dtypes"""
+        if frame not in self.report:
+            return batch
+        dtypes = self.report[frame]['dtypes']
+        conformed = {}
+        for column in batch.columns:
+            values = batch[column].reset_index(drop=True)
+            namespace = KEY_COLUMNS.get(frame, {}).get(column)
+            if namespace is not None and self.owners.get(namespace) == frame:
+                # New primary ids extend the namespace; ids already present keep their key
+                known = pd.Index(self.keys[namespace]).get_indexer(values)
+                new = pd.unique(values[known < 0])
+                self.keys[namespace] = np.concatenate([self.keys[namespace], np.asarray(new, dtype=object)])
+                conformed[column] = self._surrogate(namespace, values)
+            elif namespace is not None:
+                conformed[column] = self._surrogate(namespace, values)
+            elif column in dtypes and (pd.api.types.is_integer_dtype(dtypes[column]) or dtypes[column] == 'float32'):
+                # Keep the narrow type only while it still holds the values
+                narrow = values.astype(dtypes[column])
+                lossless = np.array_equal(narrow.to_numpy(dtype=np.float64), values.to_numpy(dtype=np.float64), equal_nan=True)
+                conformed[column] = narrow if lossless else values
+            elif column in dtypes and dtypes[column] == STRING_DTYPE:
+                conformed[column] = values.astype(STRING_DTYPE)
+            else:
+                conformed[column] = values
+        return pd.DataFrame(conformed)
+
+    def decode(self, namespace: str, keys) -> np.ndarray:
+        """Surrogate keys back to the original ids"""
+        return self.keys[namespace][np.asarray(keys)]
+
+    def totals(self) -> Dict[str, Any]:
+        before = sum(r['bytes_before'] for r in self.report.values())
+        after = sum(r['bytes_after'] for r in self.report.values())
+        return {'bytes_before': before, 'bytes_after': after,
+                'reduction': round(before / after, 2) if after else None}
@@ -0,0 +1,96 @@
+import os
+import json
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # snapshots are optional; without pyarrow data is regenerated per process
+    pa = None
+
+# Bump when the generated schema changes so stale snapshots are rebuilt
+SNAPSHOT_VERSION = 3
+
+DATASETS = ['crm', 'sales', 'financial', 'inventory', 'opportunities', 'transactions']
+
+
+def seed_from_env() -> int:
+    """DATA_SEED (default 42); generation is seeded with it whether or not snapshots are enabled"""
+    return int(os.getenv("DATA_SEED", "42"))
+
+
+class SnapshotStore:
+    """Arrow IPC snapshot of the generated datasets, loaded back memory-mapped"""
+
+    def __init__(self, path: str, seed: int, sizes: Dict[str, int]):
+        self.path = path
+        self.seed = seed
+        self.sizes = sizes
+
+    @classmethod
+    def from_env(cls, sizes: Dict[str, int]) -> Optional["SnapshotStore"]:
+        path = os.getenv("DATA_SNAPSHOT_DIR", "data_snapshot")
+        if pa is None or not path:
+            return None
+        return cls(path, seed=seed_from_env(), sizes=sizes)
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.path, "manifest.json")
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.arrow")
+
+    def _manifest_matches(self, manifest: Dict[str, Any]) -> bool:
+        return (manifest.get('version') == SNAPSHOT_VERSION and
+                manifest.get('seed') == self.seed and
+                manifest.get('sizes') == self.sizes and
+                all(name in manifest.get('frames', {}) for name in DATASETS))
+
+    def load(self) -> Optional[Dict[str, pd.DataFrame]]:
+        """Return the snapshot frames, or None when missing or stale"""
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not self._manifest_matches(manifest):
+            return None
+
+        frames = {}
+        for name in DATASETS:
+            # Memory-mapped and uncompressed: numeric and datetime columns without nulls come back as
+            # views of the mapped pages; text columns are converted into process memory
+            source = pa.memory_map(self._file(name), 'r')
+            table = pa.ipc.open_file(source).read_all()
+            frames[name] = table.to_pandas(split_blocks=True)
+        return frames
+
+    def save(self, frames: Dict[str, pd.DataFrame]):
+        os.makedirs(self.path, exist_ok=True)
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+        manifest = {
+            'version': SNAPSHOT_VERSION,
+            'seed': self.seed,
+            'sizes': self.sizes,
+            'created_at': datetime.now().isoformat(),
+            'frames': {}
+        }
+        for name in DATASETS:
+            table = pa.Table.from_pandas(frames[name], preserve_index=False)
+            tmp = self._file(name) + ".tmp"
+            with pa.OSFile(tmp, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp, self._file(name))
+            manifest['frames'][name] = {'rows': table.num_rows, 'columns': table.column_names}
+
+        # Manifest last, so a crash mid-write leaves no valid snapshot behind
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
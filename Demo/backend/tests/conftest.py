@@ -0,0 +1,40 @@
+import os
+import sys
+
+# Offline defaults, set before the agents read their configuration
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("LLM_BASE_URL", "http://127.0.0.1:9/v1")
+os.environ["DATA_SNAPSHOT_DIR"] = ""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def make_agent(monkeypatch):
+    """DataIntegrationAgent built under the given DATA_* settings"""
+    from agents.data_agent import DataIntegrationAgent
+
+    agents = []
+
+    def make(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        agent = DataIntegrationAgent()
+        agents.append(agent)
+        return agent
+
+    yield make
+    for agent in agents:
+        agent.connector.close()
+
+
+def sales_rows(agent, count=1, **overrides):
+    """New sales rows in ingest form (original customer ids), copied from existing ones"""
+    df = agent.fetch_data(['erp_sales'], {})['sales_transactions'].head(count).copy()
+    if agent.schema.report:
+        df['customer_id'] = agent.schema.decode('customer', df['customer_id'])
+    df['transaction_id'] = [f'new-{i}' for i in range(count)]
+    rows = df.astype(object).to_dict('records')
+    return [{**row, **overrides} for row in rows]
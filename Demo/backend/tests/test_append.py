@@ -0,0 +1,63 @@
+import pytest
+
+from conftest import sales_rows
+
+CONNECTORS = [{'DATA_CONNECTOR': 'memory'}, {'DATA_CONNECTOR': 'sqlite'}]
+
+
+def state(agent):
+    """What every consumer of the sales data sees: rows, cube rows, running summary, version"""
+    data = agent.fetch_data(['erp_sales'], {})
+    summary = agent.aggregate_data(data, {})['sales_summary']
+    return (len(data['sales_transactions']), summary['total_transactions'],
+            agent.erp.sales_summary().rows, agent.erp.data_version)
+
+
+@pytest.mark.parametrize("env", CONNECTORS)
+def test_append_reaches_every_consumer(make_agent, env):
+    agent = make_agent(**env)
+    rows, cube, summary, version = state(agent)
+    result = agent.ingest('erp_sales', sales_rows(agent, 3))
+    assert result['data_version'] == version + 1
+    assert state(agent) == (rows + 3, cube + 3, summary + 3, version + 1)
+
+
+@pytest.mark.parametrize("env", CONNECTORS)
+@pytest.mark.parametrize("bad", [{'customer_id': 'no-such-customer'}, {'total': 'abc'}, {'quantity': None}])
+def test_invalid_batch_is_rejected_before_anything_changes(make_agent, env, bad):
+    agent = make_agent(**env)
+    before = state(agent)
+    with pytest.raises(ValueError):
+        agent.ingest('erp_sales', sales_rows(agent, 2, **bad))
+    assert state(agent) == before
+
+
+@pytest.mark.parametrize("env", CONNECTORS)
+def test_failing_listener_leaves_the_connector_untouched(make_agent, env):
+    agent = make_agent(**env)
+    before = state(agent)
+
+    def failing(table, batch):
+        raise RuntimeError("listener failed")
+
+    agent.erp.on_append(failing)
+    with pytest.raises(RuntimeError):
+        agent.ingest('erp_sales', sales_rows(agent, 2))
+    assert state(agent) == before
+
+
+def test_unknown_source_is_rejected(make_agent):
+    agent = make_agent()
+    with pytest.raises(ValueError):
+        agent.ingest('erp_financial', [])
+
+
+def test_sqlite_file_with_appends_is_reloaded(make_agent, tmp_path):
+    env = {'DATA_CONNECTOR': 'sqlite', 'DATA_SQLITE_PATH': str(tmp_path / 'sources.db')}
+    agent = make_agent(**env)
+    rows = state(agent)[0]
+    agent.ingest('erp_sales', sales_rows(agent, 1))
+    agent.connector.close()
+
+    restarted = make_agent(**env)
+    assert state(restarted)[:3] == (rows, rows, rows)
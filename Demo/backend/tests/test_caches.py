@@ -0,0 +1,81 @@
+import pytest
+
+from agents import llm_cache
+from agents.llm_cache import LLMResponseCache
+from agents.stage_cache import StageCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache.time, 'time', clock)
+    return clock
+
+
+def test_llm_cache_key_depends_on_model_and_messages():
+    messages = [{'role': 'user', 'content': 'Q3 sales'}]
+    assert LLMResponseCache.make_key('a', messages) == LLMResponseCache.make_key('a', list(messages))
+    assert LLMResponseCache.make_key('a', messages) != LLMResponseCache.make_key('b', messages)
+
+
+def test_llm_cache_expires_after_ttl(clock):
+    cache = LLMResponseCache(':memory:', ttl_seconds=10)
+    cache.set('k', 'model', 'answer')
+    clock.now += 9
+    assert cache.get('k') == 'answer'
+    clock.now += 2
+    assert cache.get('k') is None
+    assert cache.stats()['entries'] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_llm_cache_evicts_least_recently_used(clock):
+    cache = LLMResponseCache(':memory:', max_entries=2)
+    cache.set('a', 'model', 'A')
+    clock.now += 1
+    cache.set('b', 'model', 'B')
+    clock.now += 1
+    # A hit only buffers its access time; the next write must still see it
+    assert cache.get('a') == 'A'
+    clock.now += 1
+    cache.set('c', 'model', 'C')
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == ('A', None, 'C')
+
+
+def key(version, filters=()):
+    return (('erp_sales',), filters, (('erp_sales', version),))
+
+
+def test_stage_cache_hits_and_invalidates_on_new_version():
+    cache = StageCache()
+    assert cache.get_or_compute('aggregate', key(0), lambda: {'rows': 1}) == {'rows': 1}
+    assert cache.get_or_compute('aggregate', key(0), lambda: {'rows': 2}) == {'rows': 1}
+    assert cache.get('aggregate', key(1)) is None
+    assert cache.snapshot()['invalidations'] == 1
+    assert cache.get('aggregate', key(0)) is None
+
+
+def test_stage_cache_drops_writes_for_an_outdated_version():
+    cache = StageCache()
+    cache.get('aggregate', key(1))
+    cache.put('aggregate', key(0), {'rows': 1})
+    assert cache.snapshot()['entries'] == 0
+    assert cache.snapshot()['stale_writes'] == 1
+
+
+def test_stage_cache_stays_within_its_memory_bound():
+    cache = StageCache(max_bytes=2_000)
+    for i in range(20):
+        cache.put('aggregate', key(0, (('i', str(i)),)), 'x' * 200)
+    snapshot = cache.snapshot()
+    assert snapshot['bytes'] <= 2_000
+    assert snapshot['evictions'] > 0
+    assert cache.get('aggregate', key(0, (('i', '19'),))) is not None
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from graph.dag_executor import DAGExecutor, Node
+
+
+async def collect(executor, state):
+    return [name async for name, _, _ in executor.run(state)]
+
+
+def test_nodes_run_once_inputs_exist():
+    nodes = [
+        Node('total', lambda a, b: a + b, ['a', 'b'], ['total']),
+        Node('a', lambda x: x * 2, ['x'], ['a']),
+        Node('b', lambda x: x + 1, ['x'], ['b'], blocking=True),
+    ]
+    state = {'x': 3}
+    order = asyncio.run(collect(DAGExecutor(nodes, ['x']), state))
+    assert order[-1] == 'total'
+    assert state['total'] == 10
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError):
+        DAGExecutor([Node('a', lambda b: b, ['b'], ['a']), Node('b', lambda a: a, ['a'], ['b'])])
+    with pytest.raises(ValueError):
+        DAGExecutor([Node('a', lambda: 1, [], ['x'])], initial_keys=['x'])
+
+
+def test_node_error_propagates_and_cancels_running_nodes():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    def broken():
+        raise RuntimeError("stage failed")
+
+    async def run():
+        executor = DAGExecutor([Node('slow', slow, [], ['s']), Node('broken', broken, [], ['b'])])
+        with pytest.raises(RuntimeError, match="stage failed"):
+            await collect(executor, {})
+        await asyncio.sleep(0)
+        return cancelled.is_set()
+
+    assert asyncio.run(run())
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mock_data.filters import normalize_filters
+from mock_data.rollup import RollupCube
+
+FILTERS = [
+    {},
+    {'date_from': '2025-07-01', 'date_to': '2025-09-30'},
+    {'industry': 'Retail'},
+    {'region': 'north', 'product': 'Product A'},
+    {'industry': 'Finance', 'date_from': '2025-03-15', 'date_to': '2025-08-10', 'min_amount': 500},
+    {'status': 'Completed', 'transaction_type': 'Purchase'},
+]
+SOURCES = ['erp_sales', 'transactions', 'crm_customers', 'crm_opportunities', 'erp_financial']
+
+LAYOUTS = {
+    'flat': {'DATA_CONNECTOR': 'memory', 'DATA_PARTITION_FREQ': 'none', 'DATA_STAR_SCHEMA': 'false'},
+    'partitioned_star': {'DATA_CONNECTOR': 'memory', 'DATA_PARTITION_FREQ': 'month', 'DATA_STAR_SCHEMA': 'true'},
+    'sqlite': {'DATA_CONNECTOR': 'sqlite'},
+}
+
+
+def canonical(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """Row order and dtypes differ between layouts; values must not"""
+    df = df[columns].astype(str)
+    return df.sort_values(columns).reset_index(drop=True)
+
+
+def test_rollup_matches_groupby():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    df = pd.DataFrame({
+        'date': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, n), 'D'),
+        'region': rng.choice(['North', 'South', 'East'], n),
+        'total': rng.random(n) * 1000,
+    })
+    cube = RollupCube(df, 'date', {'region': df['region']}, measures=['total'])
+    window = {'date_from': pd.Timestamp('2025-02-01'), 'date_to': pd.Timestamp('2025-05-31')}
+    rows = df[(df['date'] >= window['date_from']) & (df['date'] <= window['date_to'])]
+
+    result = cube.query(window, ['region']).set_index('region')
+    expected = rows.groupby('region')['total'].agg(['count', 'sum', 'max'])
+    assert result['count'].to_dict() == expected['count'].to_dict()
+    np.testing.assert_allclose(result.loc[expected.index, 'total_sum'], expected['sum'])
+    np.testing.assert_allclose(result.loc[expected.index, 'total_max'], expected['max'])
+
+    south = cube.query({**window, 'region': 'SOUTH'}).iloc[0]
+    assert south['count'] == (rows['region'] == 'South').sum()
+
+
+def test_rollup_append_matches_rebuild():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'date': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 90, 400), 'D'),
+                       'region': rng.choice(['North', 'South'], 400), 'total': rng.random(400)})
+    head, tail = df.iloc[:300], df.iloc[300:].assign(region='West')
+    appended = RollupCube(head, 'date', {'region': head['region']}, ['total']).append(tail, {'region': tail['region']})
+    full = pd.concat([head, tail])
+    rebuilt = RollupCube(full, 'date', {'region': full['region']}, ['total'])
+    pd.testing.assert_frame_equal(appended.query({}, ['region']), rebuilt.query({}, ['region']))
+
+
+@pytest.fixture(scope='module')
+def layouts():
+    from agents.data_agent import DataIntegrationAgent
+
+    monkeypatch = pytest.MonkeyPatch()
+    agents = {}
+    for name, env in LAYOUTS.items():
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        agents[name] = DataIntegrationAgent()
+    monkeypatch.undo()
+    yield agents
+    for agent in agents.values():
+        agent.connector.close()
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_connectors_return_the_same_rows(layouts, filters):
+    fetched = {name: agent.fetch_data(SOURCES, filters) for name, agent in layouts.items()}
+    reference = fetched['flat']
+    for name, data in fetched.items():
+        assert set(data) == set(reference), name
+        for key, df in reference.items():
+            columns = list(df.columns)
+            pd.testing.assert_frame_equal(canonical(data[key], columns), canonical(df, columns), obj=f'{name}:{key}')
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_aggregates_agree_across_cube_pushdown_and_scan(layouts, filters):
+    clean = {k: str(v.date()) if isinstance(v, pd.Timestamp) else v for k, v in normalize_filters(filters)[0].items()}
+    for name, agent in layouts.items():
+        data = agent.fetch_data(SOURCES, clean)
+        # With filters: rollup cube or SQL pushdown; without: a scan of the fetched rows
+        summarized, scanned = agent.aggregate_data(data, clean), agent.aggregate_data(data)
+        assert summarized.keys() == scanned.keys(), name
+        for section, values in scanned.items():
+            for field, value in values.items():
+                if isinstance(value, float):
+                    assert summarized[section][field] == pytest.approx(value), (name, section, field)
+                else:
+                    assert summarized[section][field] == value, (name, section, field)
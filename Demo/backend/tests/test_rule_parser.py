@@ -0,0 +1,75 @@
+import pytest
+
+from agents.rule_parser import RuleBasedQueryParser
+
+
+@pytest.fixture
+def parse():
+    parser = RuleBasedQueryParser()
+    return lambda query: parser.parse(query, {'full_name': 'Test', 'department': 'Sales', 'role': 'Manager'})
+
+
+def test_single_quarter(parse):
+    parsed, confidence = parse("Show me Q3 2025 sales performance")
+    assert parsed['report_type'] == 'sales'
+    assert (parsed['filters']['date_from'], parsed['filters']['date_to']) == ('2025-07-01', '2025-09-30')
+    assert confidence == 1.0
+
+
+@pytest.mark.parametrize("query, date_from, date_to", [
+    ("Compare Q1 and Q2 sales", '2025-01-01', '2025-06-30'),
+    ("Sales in Q3 and Q4", '2025-07-01', '2025-12-31'),
+    ("third quarter and Q4 sales", '2025-07-01', '2025-12-31'),
+])
+def test_several_quarters_span_first_to_last(parse, query, date_from, date_to):
+    filters = parse(query)[0]['filters']
+    assert (filters['date_from'], filters['date_to']) == (date_from, date_to)
+
+
+def test_months_span_first_to_last(parse):
+    filters = parse("sales from march to may")[0]['filters']
+    assert (filters['date_from'], filters['date_to']) == ('2025-03-01', '2025-05-31')
+
+
+def test_other_year_is_left_to_the_llm(parse):
+    parsed, confidence = parse("Q3 2024 sales")
+    assert parsed['filters']['date_from'] is None
+    assert confidence < 0.75
+
+
+@pytest.mark.parametrize("query, field", [
+    ("sales in North and South", 'region'),
+    ("Product A vs Product B sales", 'product'),
+    ("retail and healthcare sales", 'industry'),
+    ("pending and completed transactions", 'status'),
+])
+def test_several_values_lower_confidence(parse, query, field):
+    parsed, confidence = parse(query)
+    assert parsed['filters'].get(field) is None
+    assert confidence < 0.75
+
+
+def test_synonyms_are_one_value(parse):
+    parsed, confidence = parse("tech and technology sales")
+    assert parsed['filters']['industry'] == 'Technology'
+    assert confidence == 1.0
+
+
+def test_industry_words_do_not_pick_the_report_type(parse):
+    parsed, _ = parse("Show finance industry sales")
+    assert parsed['report_type'] == 'sales'
+    assert parsed['filters']['industry'] == 'Finance'
+
+
+@pytest.mark.parametrize("query, amount", [
+    ("sales over $5k", 5_000),
+    ("deals above 2 million", 2_000_000),
+    ("revenue over 1,500", 1_500),
+])
+def test_min_amount(parse, query, amount):
+    assert parse(query)[0]['filters']['min_amount'] == amount
+
+
+@pytest.mark.parametrize("query", ["sales over 5 months", "sales over 500"])
+def test_bare_numbers_are_not_amounts(parse, query):
+    assert parse(query)[0]['filters']['min_amount'] is None
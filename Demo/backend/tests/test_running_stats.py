@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mock_data.running_stats import RunningStats, TableSummary
+
+
+def test_merged_batches_match_the_full_data():
+    values = np.random.default_rng(0).normal(1_000, 250, 10_001)
+    merged = RunningStats()
+    for batch in np.array_split(values, 7):
+        merged = merged.merge(RunningStats.of(batch))
+    assert merged.count == len(values)
+    assert merged.mean == pytest.approx(values.mean())
+    assert merged.std == pytest.approx(pd.Series(values).std())
+    assert merged.total == pytest.approx(values.sum())
+    assert merged.maximum == values.max()
+
+
+def test_empty_stats_are_neutral():
+    stats = RunningStats.of([1.0, 2.0])
+    assert stats.merge(RunningStats()) is stats
+    assert RunningStats().merge(stats) is stats
+    assert RunningStats().to_dict()['mean'] is None
+
+
+def test_table_summary_merges_counts():
+    first = pd.DataFrame({'total': [1.0, 2.0], 'status': ['Completed', 'Pending']})
+    second = pd.DataFrame({'total': [3.0], 'status': ['Completed']})
+    merged = TableSummary.of(first, ['total'], ['status']).merge(TableSummary.of(second, ['total'], ['status']))
+    assert merged.rows == 3
+    assert merged.counts['status'] == {'Completed': 2, 'Pending': 1}
+    assert merged.measures['total'].total == 6.0
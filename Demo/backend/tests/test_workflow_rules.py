@@ -0,0 +1,46 @@
+import pytest
+
+from agents.workflow_rules import WorkflowRuleEngine, APPROVAL_CHAINS, DEFAULT_CHAIN, STAKEHOLDERS
+
+
+def request(report_type, urgency='normal', value_impact='medium', role='Manager', department='Sales'):
+    return {'report_type': report_type, 'urgency': urgency, 'value_impact': value_impact,
+            'user_role': role, 'department': department}
+
+
+def approvers(workflow):
+    return [stage['approvers'] for stage in workflow['stages']]
+
+
+@pytest.mark.parametrize("report_type", sorted(APPROVAL_CHAINS))
+@pytest.mark.parametrize("role", ['Manager', 'Director', 'C-Level'])
+def test_baseline_chain_for_every_role(report_type, role):
+    workflow = WorkflowRuleEngine().build(request(report_type, role=role))
+    assert approvers(workflow) == [[approver] for approver in APPROVAL_CHAINS[report_type]]
+    assert all(stage['type'] == 'sequential' for stage in workflow['stages'])
+
+
+def test_unknown_type_gets_single_manager_approval():
+    workflow = WorkflowRuleEngine().build(request('custom'))
+    assert approvers(workflow) == [DEFAULT_CHAIN]
+    assert workflow['stages'][0]['name'] == 'Sales Manager Review'
+
+
+def test_high_urgency_runs_in_parallel():
+    workflow = WorkflowRuleEngine().build(request('financial', urgency='high'))
+    assert approvers(workflow) == [APPROVAL_CHAINS['financial']]
+    assert workflow['stages'][0]['type'] == 'parallel'
+    assert workflow['stages'][0]['timeout_hours'] == 8
+
+
+def test_high_value_adds_stakeholders():
+    workflow = WorkflowRuleEngine().build(request('sales', value_impact='high'))
+    assert workflow['stages'][-1]['approvers'] == STAKEHOLDERS['sales']
+
+
+def test_results_are_identical_and_independent_copies():
+    engine = WorkflowRuleEngine()
+    first = engine.build(request('executive'))
+    first['stages'].clear()
+    assert engine.build(request('executive')) == WorkflowRuleEngine().build(request('executive'))
+    assert engine.build(request('executive'))['stages']